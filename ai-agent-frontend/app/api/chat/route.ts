@@ -22,21 +22,22 @@ export async function POST(req: Request) {
             return new NextResponse("Message is required", { status: 400 });
         }
 
-        // If sessionId is provided, fetch previous messages for context
-        let previousMessages: Message[] = [];
-        if (sessionId) {
-            previousMessages = await prisma.message.findMany({
-                where: {
-                    sessionId: sessionId,
-                },
-                orderBy: {
-                    createdAt: 'asc',
-                },
-            });
-        }
+        // The backend keeps each session's history, so normally only the new message is sent.
+        // It answers 409 when its copy is missing or out of date (first request, eviction,
+        // restart, another worker); the request is then retried with the full history as context.
+        // The chat UI saves the user message before calling this route, so history_length and
+        // context leave that just-saved message out; the backend adds `message` itself.
+        const [messageCount, latest] = sessionId
+            ? await Promise.all([
+                prisma.message.count({ where: { sessionId: sessionId } }),
+                prisma.message.findFirst({ where: { sessionId: sessionId }, orderBy: { createdAt: 'desc' } }),
+            ])
+            : [0, null];
+        const historyLength = latest?.role === "user" && latest.content === message
+            ? messageCount - 1
+            : messageCount;
 
-        // Forward the request to the Python backend with context
-        const response = await fetch(`${process.env.WEB_URL}/api/chat`, {
+        const sendToBackend = (context?: Message[]) => fetch(`${process.env.WEB_URL}/api/chat`, {
             method: "POST",
             headers: {
                 "Content-Type": "application/json",
@@ -45,10 +46,26 @@ export async function POST(req: Request) {
                 message,
                 session_id: sessionId,
                 user_id: session?.userId || null,
-                context: previousMessages
+                history_length: historyLength,
+                ...(context ? { context } : {})
             }),
         });
 
+        let response = await sendToBackend();
+
+        if (response.status === 409 && sessionId) {
+            const previousMessages: Message[] = await prisma.message.findMany({
+                where: {
+                    sessionId: sessionId,
+                },
+                orderBy: {
+                    createdAt: 'asc',
+                },
+                take: historyLength,
+            });
+            response = await sendToBackend(previousMessages);
+        }
+
         if (!response.ok) {
             throw new Error("Failed to get response from backend");
         }
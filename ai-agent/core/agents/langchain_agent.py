@@ -3,6 +3,7 @@ from dotenv import load_dotenv
 from langchain_google_genai import ChatGoogleGenerativeAI
 from core.tools.langchain_tools import tools
 from core.tools.web_tools import web_tools
+from core.agents.tool_executor import TimeoutToolNode
 from langgraph.prebuilt import create_react_agent
 
 load_dotenv()
@@ -13,5 +14,6 @@ llm = ChatGoogleGenerativeAI(
     temperature=0.7
 )
 
-langgraph_agent = create_react_agent(llm, tools)
-langgraph_web_agent = create_react_agent(llm, web_tools)
\ No newline at end of file
+# Tool calls of a step run in parallel, each with a timeout (see TimeoutToolNode)
+langgraph_agent = create_react_agent(llm, TimeoutToolNode(tools))
+langgraph_web_agent = create_react_agent(llm, TimeoutToolNode(web_tools))
\ No newline at end of file
@@ -0,0 +1,115 @@
+import os
+import json
+import asyncio
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Dict, Optional, Sequence
+from dotenv import load_dotenv
+from langchain_core.messages import ToolMessage
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from langgraph.prebuilt import ToolNode
+
+load_dotenv()
+
+# Threads running tool calls, shared by every agent and request in the process
+TOOL_MAX_WORKERS = int(os.getenv("TOOL_MAX_WORKERS", 16))
+# Seconds a tool call may take before the model is told it timed out
+TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT", 30))
+
+# Budgets for tools that are known to be slower (or faster) than the default
+DEFAULT_TOOL_TIMEOUTS = {
+    "web_automation": 120,
+    "image_generation": 90,
+    "ask_document_question": 60,
+    "process_management": 60,
+    "file_management": 60,
+    "send_whatsApp_message": 60,
+    "object_detection_visual": 45,
+    "image_recognition": 45,
+    "get_news": 20,
+    "google_search": 20,
+    "wikipedia": 20,
+    "math_calc": 20,
+    "weather": 10,
+}
+
+def parse_timeouts(value: Optional[str]) -> Dict[str, float]:
+    """Per-tool overrides from a "name=seconds,name=seconds" string, e.g. TOOL_TIMEOUTS."""
+    timeouts = {}
+    for item in (value or "").split(","):
+        if "=" not in item:
+            continue
+        name, seconds = item.split("=", 1)
+        try:
+            timeouts[name.strip()] = float(seconds)
+        except ValueError:
+            print(f"Ignoring invalid tool timeout: {item.strip()}")
+    return timeouts
+
+TOOL_TIMEOUTS = {**DEFAULT_TOOL_TIMEOUTS, **parse_timeouts(os.getenv("TOOL_TIMEOUTS"))}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_tool_pool() -> ContextThreadPoolExecutor:
+    """Process-wide pool for tool calls; it copies context so callbacks and tracing still work."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ContextThreadPoolExecutor(max_workers=TOOL_MAX_WORKERS, thread_name_prefix="agent-tool")
+    return _pool
+
+class TimeoutToolNode(ToolNode):
+    """ToolNode that runs tool calls concurrently on a bounded pool, each with a deadline.
+
+    The tool calls of one model step run in parallel on the shared pool (at most
+    `TOOL_MAX_WORKERS` at a time across all requests). A call that misses its budget
+    (per tool in `timeouts`, else `default_timeout`, counted from submission) is
+    answered with an error ToolMessage describing the timeout, so the model can go
+    on without it. When the surrounding run is cancelled, e.g. because a streaming
+    client disconnected, calls that have not started are cancelled. Python cannot
+    stop a running thread, so a call already in progress finishes in the background
+    and its result is dropped.
+    """
+
+    def __init__(self, tools: Sequence, timeouts: Optional[Dict[str, float]] = None,
+                 default_timeout: float = TOOL_TIMEOUT, **kwargs):
+        super().__init__(tools, **kwargs)
+        self.timeouts = TOOL_TIMEOUTS if timeouts is None else timeouts
+        self.default_timeout = default_timeout
+
+    def timeout_for(self, tool_name: str) -> float:
+        return self.timeouts.get(tool_name, self.default_timeout)
+
+    def _run_one(self, call, input_type, config) -> ToolMessage:
+        future = get_tool_pool().submit(super()._run_one, call, input_type, config)
+        timeout = self.timeout_for(call["name"])
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            return self._timeout_message(call, timeout)
+
+    async def _arun_one(self, call, input_type, config) -> ToolMessage:
+        # Sync tools run on the bounded pool rather than the event loop's default executor
+        future = asyncio.get_running_loop().run_in_executor(
+            get_tool_pool(), super()._run_one, call, input_type, config)
+        timeout = self.timeout_for(call["name"])
+        try:
+            # wait_for cancels the future on timeout and when this task is cancelled
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return self._timeout_message(call, timeout)
+
+    @staticmethod
+    def _timeout_message(call, timeout: float) -> ToolMessage:
+        print(f"Tool {call['name']} timed out after {timeout:g}s")
+        content = json.dumps({
+            "error": "timeout",
+            "tool": call["name"],
+            "timeout_seconds": timeout,
+            "message": f"{call['name']} did not finish within {timeout:g} seconds and was abandoned. "
+                       "Answer with the other results or tell the user it is unavailable right now."
+        })
+        return ToolMessage(content=content, name=call["name"], tool_call_id=call["id"], status="error")
@@ -1,4 +1,5 @@
 from .chat_history import ChatHistory
 from .vector_memory import VectorMemory
+from .service import get_chat_history, get_vector_memory
 
-__all__ = ['ChatHistory', 'VectorMemory']
+__all__ = ['ChatHistory', 'VectorMemory', 'get_chat_history', 'get_vector_memory']
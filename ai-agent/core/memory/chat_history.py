@@ -1,37 +1,75 @@
+import os
 from .vector_memory import VectorMemory
+from .write_behind import WriteBehindQueue
+from .history_buffer import HistoryBuffer, HISTORY_TOKEN_BUDGET, HISTORY_MAX_TURNS
+from .compaction import ConversationCompactor, LLMSummarizer
+
+# Off by default: summarizing calls Gemini in the background whenever turns fall out of the window
+HISTORY_SUMMARIZE = os.getenv("HISTORY_SUMMARIZE", "false").lower() == "true"
 
 class ChatHistory:
-    def __init__(self, session_only=True):
+    def __init__(self, session_only=True, write_behind=True, vector_memory=None,
+                 max_tokens=HISTORY_TOKEN_BUDGET, max_turns=HISTORY_MAX_TURNS,
+                 summarizer=None, summarize=HISTORY_SUMMARIZE):
         self.session_only = session_only
-        self.session_history = []
-        self.vector_memory = VectorMemory()
+        # Turns pushed out of the recent window are folded into a rolling summary in the background
+        self.compactor = None
+        if summarizer or summarize:
+            self.compactor = ConversationCompactor(summarizer or LLMSummarizer())
+        # Bounded by a token budget so long voice sessions stay flat in memory and prompt size
+        self.session_history = HistoryBuffer(
+            max_tokens=max_tokens,
+            max_turns=max_turns,
+            on_evict=self.compactor.submit if self.compactor else None
+        )
+        self.vector_memory = vector_memory or VectorMemory()
+        # Persist turns in the background so embedding and disk writes stay off the turn latency
+        self.writer = WriteBehindQueue(self.vector_memory) if write_behind else None
 
     def add_message(self, user_message, ai_message):
-        self.session_history.append({"user": user_message, "ai": ai_message})
+        self.session_history.append(user_message, ai_message)
         
         try:
-            self.vector_memory.add_conversation(user_message, ai_message)
+            if self.writer:
+                self.writer.submit(user_message, ai_message)
+            else:
+                self.vector_memory.add_conversation(user_message, ai_message)
         except Exception as e:
             print(f"Error adding to vector memory: {str(e)}")
 
-    def get_history(self, max_messages=10):
-        recent_messages = self.session_history[-max_messages:] if max_messages > 0 else self.session_history
-        
-        history_str = ""
-        for message in recent_messages:
-            history_str += f"User: {message['user']}\nAI: {message['ai']}\n"
-        
-        return history_str
+    def flush(self):
+        """Wait until all queued turns have been written to vector memory."""
+        if self.writer:
+            self.writer.flush()
+
+    def close(self):
+        """Flush pending writes, stop the background writer and save the memory index. Call on shutdown."""
+        if self.writer:
+            self.writer.close()
+        self.vector_memory.close()
+
+    def get_history(self, max_messages=None, max_tokens=None):
+        """Rolling summary of older turns (if any) followed by recent turns as "User:/AI:" lines,
+        within the buffer's token budget by default."""
+        recent = self.session_history.render(max_messages=max_messages, max_tokens=max_tokens)
+        summary = self.compactor.summary if self.compactor else ""
+        if summary:
+            return f"Summary of the earlier conversation:\n{summary}\n\nRecent conversation:\n{recent}"
+        return recent
     
     def get_relevant_context(self, query, k=3) -> dict:
         try:
+            self.flush()
             return self.vector_memory.get_relevant_context(query, k)
         except Exception as e:
             print(f"Error retrieving relevant context: {e}")
             return ""
 
     def reset_history(self):
-        self.session_history = []
+        self.session_history.clear()
+        if self.compactor:
+            self.compactor.clear()
+        self.flush()
         
         if not self.session_only:
             try:
@@ -41,7 +79,10 @@ class ChatHistory:
                 print(f"Error resetting vector memory: {e}")
     
     def end_session(self):
-        self.session_history = []
+        self.session_history.clear()
+        if self.compactor:
+            self.compactor.clear()
+        self.flush()
         
         if self.session_only:
             try:
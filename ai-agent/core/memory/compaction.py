@@ -0,0 +1,108 @@
+import threading
+from typing import Callable, Dict, List, Optional
+
+Turns = List[Dict[str, str]]
+# A summarizer takes the current rolling summary (possibly "") and the turns to fold
+# into it, and returns the new summary. Any callable with this shape can be plugged in.
+Summarizer = Callable[[str, Turns], str]
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an AI assistant.\n"
+    "Update the summary with the new turns below. Keep names, facts, decisions, open tasks and "
+    "user preferences; drop greetings and filler. Reply with the updated summary only, at most "
+    "{max_words} words.\n\n"
+    "Current summary:\n{summary}\n\n"
+    "New turns:\n{turns}"
+)
+
+class LLMSummarizer:
+    """Default summarizer backed by Gemini; the model is created on first use."""
+
+    def __init__(self, llm=None, max_words: int = 150):
+        self.llm = llm
+        self.max_words = max_words
+
+    def __call__(self, summary: str, turns: Turns) -> str:
+        if self.llm is None:
+            import os
+            from langchain_google_genai import ChatGoogleGenerativeAI
+            self.llm = ChatGoogleGenerativeAI(
+                api_key=os.getenv("GOOGLE_API_KEY"),
+                model="gemini-2.0-flash",
+                temperature=0
+            )
+
+        rendered = "".join(f"User: {turn['user']}\nAI: {turn['ai']}\n" for turn in turns)
+        prompt = SUMMARY_PROMPT.format(max_words=self.max_words, summary=summary or "(empty)", turns=rendered)
+        return self.llm.invoke(prompt).content.strip()
+
+class ConversationCompactor:
+    """Folds turns that fell out of the recent-history window into a rolling summary.
+
+    `submit` only queues the turns; a background thread folds everything pending into
+    the summary with a single summarizer call, so compaction never blocks a turn. If
+    the summarizer fails, those turns are retried together with the next submitted
+    batch (at most `max_pending` turns are kept, oldest dropped first).
+    """
+
+    def __init__(self, summarizer: Summarizer, max_pending: int = 50):
+        self.summarizer = summarizer
+        self.max_pending = max_pending
+        self._summary = ""
+        self._pending: Turns = []
+        self._failed: Turns = []
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._busy = False
+        self._generation = 0
+        self._worker = threading.Thread(target=self._run, name="history-compactor", daemon=True)
+        self._worker.start()
+
+    @property
+    def summary(self) -> str:
+        with self._lock:
+            return self._summary
+
+    def submit(self, turns: Turns) -> None:
+        with self._lock:
+            self._pending = self._failed + self._pending + list(turns)
+            self._failed = []
+            if len(self._pending) > self.max_pending:
+                del self._pending[:len(self._pending) - self.max_pending]
+            self._wake.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every submitted turn has been folded in (or failed). Returns False on timeout."""
+        with self._lock:
+            return self._wake.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._summary = ""
+            self._pending = []
+            self._failed = []
+            # A fold that is already running must not write its result back
+            self._generation += 1
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                self._wake.wait_for(lambda: self._pending)
+                turns, self._pending = self._pending, []
+                summary, generation = self._summary, self._generation
+                self._busy = True
+
+            try:
+                new_summary = self.summarizer(summary, turns)
+            except Exception as e:
+                print(f"Error summarizing conversation history: {e}")
+                new_summary = None
+
+            with self._lock:
+                if generation == self._generation:
+                    if new_summary is None:
+                        self._failed = turns[-self.max_pending:]
+                    else:
+                        self._summary = new_summary
+                self._busy = False
+                self._wake.notify_all()
@@ -0,0 +1,196 @@
+import os
+import sqlite3
+import hashlib
+import threading
+import time
+from array import array
+from typing import List, Optional, Sequence
+from dotenv import load_dotenv
+from langchain_core.embeddings import Embeddings
+
+load_dotenv()
+
+EMBEDDING_CACHE_PATH = os.getenv(
+    "EMBEDDING_CACHE_PATH",
+    os.path.join(os.getenv("VECTOR_DB_PATH", ""), "embedding_cache.sqlite3")
+)
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", 200000))
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """On-disk, content-addressed embedding cache backed by SQLite.
+
+    Entries are keyed by (model, output dimensionality, task type, sha256 of the text)
+    and evicted least-recently-used first once `max_entries` is exceeded. Vectors are
+    stored as packed float32, which is what the vector stores keep anyway.
+    """
+
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH, max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL,"
+            " dimensions INTEGER NOT NULL,"
+            " task_type TEXT NOT NULL,"
+            " content_hash TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " PRIMARY KEY (model, dimensions, task_type, content_hash))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get_many(self, model: str, dimensions: int, task_type: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Return cached vectors aligned with `texts`, with None for every miss."""
+        hashes = [content_hash(text) for text in texts]
+        found = {}
+
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(hashes), 500):
+                chunk = hashes[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT content_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND dimensions = ? AND task_type = ? AND content_hash IN ({placeholders})",
+                    (model, dimensions, task_type, *chunk)
+                ).fetchall()
+                found.update(rows)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? "
+                    "WHERE model = ? AND dimensions = ? AND task_type = ? AND content_hash = ?",
+                    [(now, model, dimensions, task_type, h) for h in found]
+                )
+                self._conn.commit()
+
+            results = [self._unpack(found[h]) if h in found else None for h in hashes]
+            hit_count = sum(1 for r in results if r is not None)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+
+        return results
+
+    def put_many(self, model: str, dimensions: int, task_type: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        now = time.time()
+        rows = [
+            (model, dimensions, task_type, content_hash(text), array("f", vector).tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+        if not rows:
+            return
+
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, dimensions, task_type, content_hash, vector, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            # Replaced rows are counted too, so this can over-estimate; the eviction pass recounts.
+            self._size += self._conn.total_changes - before
+            if self._size > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        excess = self._size - self.max_entries
+        if excess <= 0:
+            return
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE rowid IN "
+            "(SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+            (excess,)
+        )
+        self._size -= excess
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._size = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _unpack(blob: bytes) -> List[float]:
+        vector = array("f")
+        vector.frombytes(blob)
+        return vector.tolist()
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Process-wide cache shared by conversation memory and document RAG."""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = EmbeddingCache()
+    return _default_cache
+
+class CachedEmbeddings(Embeddings):
+    """Wraps a LangChain `Embeddings` instance so repeated texts are served from the cache."""
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache = None,
+                 document_task_type: str = "RETRIEVAL_DOCUMENT",
+                 query_task_type: str = "RETRIEVAL_QUERY"):
+        self.embeddings = embeddings
+        self.cache = cache or get_embedding_cache()
+        self.model = getattr(embeddings, "model", type(embeddings).__name__)
+        self.dimensions = getattr(embeddings, "output_dimensionality", None) or 0
+        self.document_task_type = document_task_type
+        self.query_task_type = query_task_type
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        texts = list(texts)
+        cached = self.cache.get_many(self.model, self.dimensions, self.document_task_type, texts)
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+
+        if missing:
+            computed = self.embeddings.embed_documents([texts[i] for i in missing])
+            self.cache.put_many(self.model, self.dimensions, self.document_task_type,
+                                [texts[i] for i in missing], computed)
+            for i, vector in zip(missing, computed):
+                cached[i] = list(vector)
+
+        return cached
+
+    def embed_query(self, text: str) -> List[float]:
+        cached = self.cache.get_many(self.model, self.dimensions, self.query_task_type, [text])[0]
+        if cached is not None:
+            return cached
+
+        vector = self.embeddings.embed_query(text)
+        self.cache.put_many(self.model, self.dimensions, self.query_task_type, [text], [vector])
+        return list(vector)
@@ -0,0 +1,89 @@
+import os
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional
+from dotenv import load_dotenv
+from core.utils.tokens import estimate_tokens
+
+load_dotenv()
+
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", 2000))
+HISTORY_MAX_TURNS = int(os.getenv("HISTORY_MAX_TURNS", 50))
+
+class HistoryBuffer:
+    """Ring buffer of recent conversation turns trimmed to a token budget.
+
+    The "User: ...\\nAI: ..." rendering of the buffered turns is kept as one cached
+    string that is appended to on every turn and sliced from the front when old turns
+    fall out, so `render()` with no limits is O(1). The newest turn is always kept,
+    even if it alone exceeds the budget.
+    """
+
+    def __init__(self, max_tokens: int = HISTORY_TOKEN_BUDGET, max_turns: int = HISTORY_MAX_TURNS,
+                 on_evict: Optional[Callable[[List[Dict[str, str]]], None]] = None):
+        self.max_tokens = max_tokens
+        self.max_turns = max_turns
+        self.on_evict = on_evict
+        self._turns = deque()
+        self._rendered = ""
+        self._tokens = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._turns)
+
+    @property
+    def tokens(self) -> int:
+        return self._tokens
+
+    @property
+    def turns(self) -> List[Dict[str, str]]:
+        with self._lock:
+            return [turn for turn, _, _ in self._turns]
+
+    def append(self, user_message: str, ai_message: str) -> List[Dict[str, str]]:
+        """Add a turn and return the turns evicted to stay within the budget."""
+        turn = {"user": user_message, "ai": ai_message}
+        text = f"User: {user_message}\nAI: {ai_message}\n"
+        tokens = estimate_tokens(text)
+        evicted = []
+
+        with self._lock:
+            self._turns.append((turn, text, tokens))
+            self._rendered += text
+            self._tokens += tokens
+
+            while len(self._turns) > 1 and (self._tokens > self.max_tokens or len(self._turns) > self.max_turns):
+                old_turn, old_text, old_tokens = self._turns.popleft()
+                self._rendered = self._rendered[len(old_text):]
+                self._tokens -= old_tokens
+                evicted.append(old_turn)
+
+        if evicted and self.on_evict:
+            self.on_evict(evicted)
+        return evicted
+
+    def render(self, max_messages: Optional[int] = None, max_tokens: Optional[int] = None) -> str:
+        """Render the newest turns, optionally limited by count and/or token budget."""
+        with self._lock:
+            if not max_messages and max_tokens is None:
+                return self._rendered
+
+            entries = list(self._turns)
+            if max_messages:
+                entries = entries[-max_messages:]
+            if max_tokens is not None:
+                kept, used = [], 0
+                for entry in reversed(entries):
+                    if kept and used + entry[2] > max_tokens:
+                        break
+                    kept.append(entry)
+                    used += entry[2]
+                entries = kept[::-1]
+            return "".join(text for _, text, _ in entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._turns.clear()
+            self._rendered = ""
+            self._tokens = 0
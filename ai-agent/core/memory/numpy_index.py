@@ -0,0 +1,109 @@
+import os
+import json
+import numpy as np
+from typing import List, Sequence, Tuple
+
+class NumpyIndex:
+    """Exact cosine top-k index over a contiguous, row-normalized matrix.
+
+    Meant for small collections (a few thousand vectors) where a single matrix-vector
+    product beats an ANN lookup. Vectors are stored as float32 (or float16 to halve the
+    footprint) and the matrix can be saved to and memory-mapped from a `.npy` file.
+    """
+
+    def __init__(self, dimensions: int, dtype: str = "float32", initial_capacity: int = 1024):
+        self.dimensions = dimensions
+        self.dtype = np.dtype(dtype)
+        self._matrix = np.empty((initial_capacity, dimensions), dtype=self.dtype)
+        self._size = 0
+        self.ids: List[str] = []
+        self._positions = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, entry_id: str) -> bool:
+        return entry_id in self._positions
+
+    def add(self, ids: Sequence[str], vectors) -> None:
+        """Add vectors, overwriting the row of any ID that is already indexed."""
+        vectors = self._normalize(np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimensions))
+
+        new_rows = sum(1 for entry_id in dict.fromkeys(ids) if entry_id not in self._positions)
+        self._reserve(self._size + new_rows)
+
+        for entry_id, vector in zip(ids, vectors):
+            position = self._positions.get(entry_id)
+            if position is None:
+                position = self._size
+                self._positions[entry_id] = position
+                self.ids.append(entry_id)
+                self._size += 1
+            self._matrix[position] = vector
+
+    def search(self, vector, k: int) -> List[Tuple[str, float]]:
+        """Return up to k (id, cosine similarity) pairs, best first."""
+        if self._size == 0 or k <= 0:
+            return []
+
+        query = self._normalize(np.asarray(vector, dtype=np.float32).reshape(1, -1))[0]
+        scores = self._matrix[:self._size] @ query.astype(self.dtype, copy=False)
+
+        if k < self._size:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(self._size)
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        return [(self.ids[i], float(scores[i])) for i in top]
+
+    def clear(self) -> None:
+        self._matrix = np.empty((1024, self.dimensions), dtype=self.dtype)
+        self._size = 0
+        self.ids = []
+        self._positions = {}
+
+    def save(self, path: str) -> None:
+        """Write `<path>.npy` (the matrix) and `<path>.ids.json` (row order)."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.save(f"{path}.npy", self._matrix[:self._size])
+        with open(f"{path}.ids.json", "w", encoding="utf-8") as f:
+            json.dump(self.ids, f)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "NumpyIndex":
+        """Load a saved index; with `mmap=True` the matrix is memory-mapped read-only
+        until the first `add`, which copies it into a growable in-memory buffer."""
+        matrix = np.load(f"{path}.npy", mmap_mode="r" if mmap else None)
+        with open(f"{path}.ids.json", "r", encoding="utf-8") as f:
+            ids = json.load(f)
+
+        index = cls(matrix.shape[1], dtype=matrix.dtype.name, initial_capacity=1)
+        index._matrix = matrix
+        index._size = len(ids)
+        index.ids = ids
+        index._positions = {entry_id: i for i, entry_id in enumerate(ids)}
+        return index
+
+    @staticmethod
+    def remove_saved(path: str) -> None:
+        for suffix in (".npy", ".ids.json"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    def _reserve(self, size: int) -> None:
+        capacity = self._matrix.shape[0]
+        if size <= capacity and self._matrix.flags.writeable:
+            return
+        new_capacity = max(size, capacity * 2, 1024)
+        matrix = np.empty((new_capacity, self.dimensions), dtype=self.dtype)
+        matrix[:self._size] = self._matrix[:self._size]
+        self._matrix = matrix
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
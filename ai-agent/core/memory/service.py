@@ -0,0 +1,53 @@
+"""Process-wide memory service.
+
+The Gemini client, the Chroma-backed VectorMemory and the ChatHistory built on top
+of it are created once, on first use, and shared by main.py and every tool. All
+getters are safe to call from FastAPI worker threads.
+"""
+import os
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_lock = threading.RLock()
+_genai_client = None
+_vector_memory = None
+_chat_history = None
+
+def get_genai_client():
+    """Shared `genai.Client`, so its HTTP connection pool stays warm between calls."""
+    global _genai_client
+    if _genai_client is None:
+        with _lock:
+            if _genai_client is None:
+                from google import genai
+                _genai_client = genai.Client(api_key=os.getenv('GOOGLE_API_KEY'))
+    return _genai_client
+
+def get_vector_memory():
+    global _vector_memory
+    if _vector_memory is None:
+        with _lock:
+            if _vector_memory is None:
+                from .vector_memory import VectorMemory
+                _vector_memory = VectorMemory()
+    return _vector_memory
+
+def get_chat_history(session_only: bool = True):
+    """Shared ChatHistory. `session_only` only takes effect on the first call."""
+    global _chat_history
+    if _chat_history is None:
+        with _lock:
+            if _chat_history is None:
+                from .chat_history import ChatHistory
+                _chat_history = ChatHistory(session_only=session_only, vector_memory=get_vector_memory())
+    return _chat_history
+
+def shutdown() -> None:
+    """Flush pending memory writes and save indexes. Safe to call more than once."""
+    with _lock:
+        if _chat_history is not None:
+            _chat_history.close()
+        elif _vector_memory is not None:
+            _vector_memory.close()
@@ -1,44 +1,176 @@
 import os
+import time
+import threading
+import hashlib
 import chromadb
-from google import genai
+from concurrent.futures import ThreadPoolExecutor
 from google.generativeai import types
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
 import json
+from .embedding_cache import EmbeddingCache, get_embedding_cache
+from .service import get_genai_client
+from core.retrieval.bm25 import BM25Index
+from core.retrieval.fusion import reciprocal_rank_fusion
 
 # Load environment variables
 load_dotenv()
 
+EMBEDDING_MODEL = "gemini-embedding-exp-03-07"
+EMBEDDING_TASK_TYPE = "SEMANTIC_SIMILARITY"
+EMBEDDING_DIMENSIONS = 64
+
 class GeminiEmbeddingFunction:
-    def __init__(self):
-        self.client = genai.Client(api_key=os.getenv('GOOGLE_API_KEY'))
+    def __init__(self,
+                 client: Any = None,
+                 batch_size: int = int(os.getenv("EMBEDDING_BATCH_SIZE", 32)),
+                 max_workers: int = int(os.getenv("EMBEDDING_MAX_WORKERS", 4)),
+                 max_retries: int = 2,
+                 retry_backoff: float = 0.5,
+                 cache: Optional[EmbeddingCache] = None,
+                 use_cache: bool = True):
+        # A custom client (e.g. an offline fake) can be injected for testing and benchmarks
+        self.client = client or get_genai_client()
+        self.cache = cache or (get_embedding_cache() if use_cache else None)
+        self.batch_size = max(1, batch_size)
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
 
     def __call__(self, input: List[str]) -> List[List[float]]:
-        """Main embedding method required by ChromaDB"""
-        embeddings = []
-
-        for text in input:
-            result = self.client.models.embed_content(
-                model = "gemini-embedding-exp-03-07",
-                contents = text,
-                config={ 'task_type':"SEMANTIC_SIMILARITY", "output_dimensionality": 64 },
-            )
-            # Extract the actual numerical values and flatten the list
-            numerical_embeddings = [value for embedding in result.embeddings for value in embedding.values]
-            embeddings.append(numerical_embeddings)
+        """Main embedding method required by ChromaDB.
+
+        Cached texts are served from the on-disk embedding cache. The rest are sent
+        `batch_size` at a time with up to `max_workers` requests running concurrently.
+        The returned embeddings are in the same order as `input`.
+        """
+        texts = list(input)
+        if not texts:
+            return []
+
+        if self.cache is None:
+            return self._embed(texts)
+
+        embeddings = self.cache.get_many(EMBEDDING_MODEL, EMBEDDING_DIMENSIONS, EMBEDDING_TASK_TYPE, texts)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            computed = self._embed([texts[i] for i in missing])
+            self.cache.put_many(EMBEDDING_MODEL, EMBEDDING_DIMENSIONS, EMBEDDING_TASK_TYPE,
+                                [texts[i] for i in missing], computed)
+            for i, embedding in zip(missing, computed):
+                embeddings[i] = embedding
+
         return embeddings
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(batches) == 1:
+            return self._embed_batch(batches[0])
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as pool:
+            # map() yields results in submission order, which keeps the output aligned with the input
+            results = list(pool.map(self._embed_batch, batches))
+
+        return [embedding for batch in results for embedding in batch]
+
+    def _request(self, contents: List[str]) -> List[List[float]]:
+        result = self.client.models.embed_content(
+            model = EMBEDDING_MODEL,
+            contents = contents,
+            config={ 'task_type': EMBEDDING_TASK_TYPE, "output_dimensionality": EMBEDDING_DIMENSIONS },
+        )
+        return [list(embedding.values) for embedding in result.embeddings]
+
+    def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        """Embed a batch in one request, falling back to per-item retries if it fails."""
+        try:
+            embeddings = self._request(batch)
+            if len(embeddings) == len(batch):
+                return embeddings
+            print(f"Embedding batch returned {len(embeddings)} vectors for {len(batch)} texts, retrying per item")
+        except Exception as e:
+            print(f"Embedding batch of {len(batch)} failed, retrying per item: {e}")
+
+        return [self._embed_single(text) for text in batch]
+
+    def _embed_single(self, text: str) -> List[float]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self._request([text])[0]
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self.retry_backoff * (2 ** attempt))
     
     def name(self) -> str:
         """Required by Chroma for embedding function identification"""
-        return "gemini-embedding-exp-03-07"
+        return EMBEDDING_MODEL
     
+class EntryIdAllocator:
+    """Allocates monotonic, lexicographically sortable entry IDs without touching the database.
+
+    IDs look like `<13-digit epoch ms>-<6-digit counter>-<8 hex node>`. The counter orders
+    IDs issued within the same millisecond (or while the clock steps backwards) and the
+    random per-process node suffix keeps concurrent writers from colliding.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._node = os.urandom(4).hex()
+        self._last_ms = 0
+        self._counter = 0
+
+    def next_id(self) -> str:
+        with self._lock:
+            now_ms = int(time.time() * 1000)
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._counter = 0
+            else:
+                self._counter += 1
+                if self._counter > 999999:
+                    self._last_ms += 1
+                    self._counter = 0
+            return f"{self._last_ms:013d}-{self._counter:06d}-{self._node}"
+
+_id_allocator = EntryIdAllocator()
+
+def new_entry_id() -> str:
+    """A fresh time-ordered entry ID, for callers that allocate it before the write."""
+    return _id_allocator.next_id()
+
+# "chroma" (HNSW in Chroma) or "numpy" (exact in-process top-k, for small collections)
+VECTOR_MEMORY_INDEX = os.getenv("VECTOR_MEMORY_INDEX", "chroma")
+NUMPY_INDEX_MAX_SIZE = int(os.getenv("VECTOR_MEMORY_NUMPY_MAX_SIZE", 20000))
+# Keep a BM25 side index and fuse it with vector hits in get_relevant_context
+VECTOR_MEMORY_HYBRID = os.getenv("VECTOR_MEMORY_HYBRID", "true").lower() == "true"
+
 class VectorMemory:
     def __init__(self, 
                  persist_directory: str = os.getenv("VECTOR_DB_PATH"),
-                 collection_name: str = "conversations"):
+                 collection_name: str = "conversations",
+                 index_backend: str = VECTOR_MEMORY_INDEX,
+                 numpy_max_size: int = NUMPY_INDEX_MAX_SIZE,
+                 numpy_dtype: str = "float32",
+                 embedding_function: Any = None,
+                 hybrid: bool = VECTOR_MEMORY_HYBRID,
+                 lexical_confidence: float = 0.8,
+                 lexical_margin: float = 1.5):
         
         self.persist_directory = persist_directory
         self.collection_name = collection_name
+        self.index_backend = index_backend
+        self.numpy_max_size = numpy_max_size
+        self.numpy_dtype = numpy_dtype
+        self.embedding_function = embedding_function or GeminiEmbeddingFunction()
+        self.index = None
+        self._index_metadata = {}
+        self.hybrid = hybrid
+        self.lexical_confidence = lexical_confidence
+        self.lexical_margin = lexical_margin
+        self.lexical_index = None
+        # Guards the in-process index and the local count against concurrent writers and readers
+        self._lock = threading.RLock()
         
         # Initialize Chroma client and collection
         self._initialize_client()
@@ -51,46 +183,219 @@ class VectorMemory:
         self.collection = self.client.get_or_create_collection(
             name=self.collection_name,
             metadata={"hnsw:space": "cosine"},
-            embedding_function=GeminiEmbeddingFunction()
+            embedding_function=self.embedding_function
         )
+        # Tracked locally so searches do not need a count() round trip
+        self._count = self.collection.count()
 
-    def add_conversation(self, user_message: str, ai_message: str, context: Dict[str, Any] = None) -> None:
-        conversation = f"User: {user_message}\nAI: {ai_message}"
-        metadata = {
-            "user_message": user_message,
-            "ai_message": ai_message,
-            "context": json.dumps(context) if context else "{}"
-        }
-        
-        # Generate ID based on current count
-        entry_id = str(self.collection.count() + 1)
-        
-        self.collection.add(
-            documents=[conversation],
-            metadatas=[metadata],
-            ids=[entry_id]
+        if self.index_backend == "numpy":
+            self._load_index()
+
+        if self.hybrid:
+            self.lexical_index = BM25Index()
+            if self._count:
+                stored = self.collection.get(include=["documents"])
+                for entry_id, document in zip(stored["ids"], stored["documents"]):
+                    self.lexical_index.add(entry_id, document)
+
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.persist_directory or "", f"{self.collection_name}_index")
+
+    def _load_index(self) -> None:
+        """Build the in-process index from the saved matrix, or from Chroma if it is stale."""
+        # numpy is only needed for this backend
+        from .numpy_index import NumpyIndex
+
+        self.index = None
+        self._index_metadata = {}
+        if self._count > self.numpy_max_size:
+            print(f"Conversation memory has {self._count} entries, using Chroma search")
+            return
+
+        stored = self.collection.get(include=["metadatas"])
+        self._index_metadata = dict(zip(stored["ids"], stored["metadatas"]))
+
+        try:
+            index = NumpyIndex.load(self._index_path)
+            if set(index.ids) == set(self._index_metadata):
+                self.index = index
+                return
+        except (OSError, ValueError):
+            pass
+
+        index = NumpyIndex(EMBEDDING_DIMENSIONS, dtype=self.numpy_dtype)
+        if stored["ids"]:
+            stored = self.collection.get(ids=stored["ids"], include=["embeddings"])
+            index.add(stored["ids"], stored["embeddings"])
+        self.index = index
+
+    def add_conversation(self, user_message: str, ai_message: str, context: Dict[str, Any] = None,
+                         idempotent: bool = False) -> str:
+        return self.add_conversations([(user_message, ai_message, context)], idempotent=idempotent)[0]
+
+    def upsert_conversation(self, user_message: str, ai_message: str, context: Dict[str, Any] = None) -> str:
+        """Store a turn under an ID derived from its content, so retried writes never duplicate it."""
+        return self.add_conversation(user_message, ai_message, context, idempotent=True)
+
+    def add_conversations(self, turns: List[Tuple[str, str, Optional[Dict[str, Any]]]],
+                          idempotent: bool = False, ids: Optional[List[str]] = None) -> List[str]:
+        """Store several (user_message, ai_message, context) turns with one collection write.
+
+        By default each turn gets a fresh time-ordered ID. With `ids` (one per turn, e.g.
+        from `new_entry_id()` when the turn happened) the turns are upserted under those
+        IDs, so writing the same turn again (e.g. a retry) replaces its row instead of adding
+        a duplicate. With `idempotent=True` the ID is derived from the turn's content hash
+        and the write is an upsert, so identical turns share one row.
+        """
+        if not turns:
+            return []
+        if ids is not None and len(ids) != len(turns):
+            raise ValueError(f"Expected {len(turns)} ids, got {len(ids)}")
+        upsert = idempotent or ids is not None
+        given_ids = ids
+
+        documents, metadatas, ids = [], [], []
+        for i, (user_message, ai_message, context) in enumerate(turns):
+            conversation = f"User: {user_message}\nAI: {ai_message}"
+            context_json = json.dumps(context, sort_keys=True) if context else "{}"
+            digest = hashlib.sha256(f"{conversation}\n{context_json}".encode("utf-8")).hexdigest()
+
+            documents.append(conversation)
+            metadatas.append({
+                "user_message": user_message,
+                "ai_message": ai_message,
+                "context": context_json,
+                "content_hash": digest,
+                "created_at": time.time()
+            })
+            if given_ids is not None:
+                ids.append(given_ids[i])
+            else:
+                ids.append(f"h-{digest[:32]}" if idempotent else _id_allocator.next_id())
+
+        # Chroma rejects duplicate IDs within one call; identical turns collapse to one row anyway
+        keep = sorted({entry_id: i for i, entry_id in enumerate(ids)}.values())
+        documents = [documents[i] for i in keep]
+        metadatas = [metadatas[i] for i in keep]
+        unique_ids = [ids[i] for i in keep]
+
+        # Embed once here so the same vectors feed both Chroma and the in-process index
+        embeddings = self.embedding_function(documents)
+
+        write = self.collection.upsert if upsert else self.collection.add
+        write(
+            documents=documents,
+            metadatas=metadatas,
+            embeddings=embeddings,
+            ids=unique_ids
         )
 
-    def search(self, query: str, k: int = 3) -> Any:
+        with self._lock:
+            if self.lexical_index is not None:
+                for entry_id, document in zip(unique_ids, documents):
+                    self.lexical_index.add(entry_id, document)
+
+            if self.index is not None:
+                self._count += sum(1 for entry_id in unique_ids if entry_id not in self.index)
+                self.index.add(unique_ids, embeddings)
+                self._index_metadata.update(zip(unique_ids, metadatas))
+                if len(self.index) > self.numpy_max_size:
+                    print(f"Conversation memory exceeded {self.numpy_max_size} entries, switching to Chroma search")
+                    self._drop_index()
+            else:
+                # Without an index to check against, every written ID counts as new: allocated IDs
+                # are fresh (a retry follows a write that failed), and a content-hash upsert may
+                # over-count. _count only caps n_results and skips empty searches, and it is
+                # recounted on open and reset.
+                self._count += len(unique_ids)
+        return ids
+
+    def _drop_index(self) -> None:
+        from .numpy_index import NumpyIndex
+
+        self.index = None
+        self._index_metadata = {}
+        NumpyIndex.remove_saved(self._index_path)
+
+    def _vector_search(self, query: str, k: int) -> List[Tuple[str, Dict[str, Any], float]]:
+        """Dense top-k as (id, metadata, cosine similarity) triples."""
+        if self._count == 0:
+            return []
+
+        query_embedding = self.embedding_function([query])[0]
+
+        with self._lock:
+            if self.index is not None:
+                return [
+                    (entry_id, self._index_metadata[entry_id], score)
+                    for entry_id, score in self.index.search(query_embedding, k)
+                ]
+
         results = self.collection.query(
-            query_texts=[query],
-            n_results=min(k, self.collection.count()),
+            query_embeddings=[query_embedding],
+            n_results=min(k, self._count),
             include=["metadatas", "distances"]
         )
-        
-        formatted_results = []
-        for metadata, distance in zip(results["metadatas"][0], results["distances"][0]):
-            formatted_results.append({
-                "user_message": metadata["user_message"],
-                "ai_message": metadata["ai_message"],
-                "context": json.loads(metadata["context"]),
-                "score": 1 - distance  # Convert cosine distance to similarity score
-            })
-        
-        return formatted_results
+        # Convert cosine distance to similarity score
+        return [
+            (entry_id, metadata, 1 - distance)
+            for entry_id, metadata, distance in zip(results["ids"][0], results["metadatas"][0], results["distances"][0])
+        ]
+
+    def search(self, query: str, k: int = 3) -> Any:
+        return [self._format_result(metadata, score) for _, metadata, score in self._vector_search(query, k)]
+
+    def hybrid_search(self, query: str, k: int = 3) -> Any:
+        """BM25 + vector retrieval fused with reciprocal rank fusion.
+
+        When the best lexical hit covers most of the query's (IDF-weighted) terms and
+        clearly beats the runner-up, the lexical ranking is returned directly and the
+        embedding call is skipped.
+        """
+        if self.lexical_index is None:
+            return self.search(query, k)
+
+        with self._lock:
+            lexical = self.lexical_index.search(query, k * 4)
+            confident = bool(lexical) and self.lexical_index.coverage(query, lexical[0][0]) >= self.lexical_confidence \
+                and (len(lexical) == 1 or lexical[0][1] >= self.lexical_margin * lexical[1][1])
+
+        if confident:
+            hits = lexical[:k]
+            metadata = self._get_metadatas([entry_id for entry_id, _ in hits])
+            return [self._format_result(metadata[entry_id], score) for entry_id, score in hits if entry_id in metadata]
+
+        vector = self._vector_search(query, k * 4)
+        fused = reciprocal_rank_fusion([
+            [entry_id for entry_id, _ in lexical],
+            [entry_id for entry_id, _, _ in vector]
+        ])[:k]
+
+        metadata = {entry_id: entry_metadata for entry_id, entry_metadata, _ in vector}
+        missing = [entry_id for entry_id, _ in fused if entry_id not in metadata]
+        if missing:
+            metadata.update(self._get_metadatas(missing))
+        return [self._format_result(metadata[entry_id], score) for entry_id, score in fused if entry_id in metadata]
+
+    def _get_metadatas(self, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            if self.index is not None:
+                return {entry_id: self._index_metadata[entry_id] for entry_id in ids if entry_id in self._index_metadata}
+        stored = self.collection.get(ids=ids, include=["metadatas"])
+        return dict(zip(stored["ids"], stored["metadatas"]))
+
+    @staticmethod
+    def _format_result(metadata: Dict[str, Any], score: float) -> Dict[str, Any]:
+        return {
+            "user_message": metadata["user_message"],
+            "ai_message": metadata["ai_message"],
+            "context": json.loads(metadata["context"]),
+            "score": score
+        }
 
     def get_relevant_context(self, query: str, k: int = 3) -> dict:
-        results = self.search(query, k)
+        results = self.hybrid_search(query, k)
         
         if not results:
             return {"result": "", "error": "No relevant context found"}
@@ -103,7 +408,21 @@ class VectorMemory:
 
     def reset(self) -> None:
         """Reset the vector memory by deleting the collection"""
-        self.client.delete_collection(name=self.collection_name)
-        self._initialize_client()
+        with self._lock:
+            self.client.delete_collection(name=self.collection_name)
+            if self.index_backend == "numpy":
+                self._drop_index()
+            self._initialize_client()
         print("Vector memory has been reset")
 
+    def close(self) -> None:
+        """Save the in-process index so the next start can memory-map it instead of rebuilding."""
+        with self._lock:
+            if self.index is None:
+                return
+            try:
+                self.index.save(self._index_path)
+            except Exception as e:
+                print(f"Error saving conversation index: {e}")
+
+
@@ -0,0 +1,114 @@
+import atexit
+import queue
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from .vector_memory import new_entry_id
+
+# (user_message, ai_message, context, entry_id)
+Turn = Tuple[str, str, Optional[Dict[str, Any]], str]
+
+class WriteBehindQueue:
+    """Persists conversation turns to VectorMemory from a background thread.
+
+    Turns are collected into micro-batches of up to `max_batch` items (or whatever
+    arrived within `flush_interval` seconds of the first one) and written with a
+    single `VectorMemory.add_conversations` call, so embedding and the Chroma write
+    happen off the caller's critical path.
+
+    Durability contract:
+    - `submit` only guarantees the turn is queued in memory, not that it is on disk.
+    - A queued turn is normally written within `flush_interval` seconds plus the time
+      it takes to embed and store its batch.
+    - `flush()` blocks until every turn submitted before the call has been written
+      (or has failed and been logged). `close()` flushes and stops the worker; it is
+      registered with `atexit`, so a normal interpreter exit does not lose turns.
+    - Turns still queued when the process is killed or crashes are lost.
+    - When the queue is full, `submit` waits up to `put_timeout` seconds and then
+      writes the turn synchronously instead of dropping it.
+    - Each turn gets its time-ordered entry ID in `submit` and is upserted under it, so
+      a retried batch cannot create duplicates while identical turns stay separate
+      rows. A failed batch is retried once item by item; items that fail again are
+      logged and dropped.
+    """
+
+    def __init__(self, vector_memory, max_queue: int = 1000, max_batch: int = 32,
+                 flush_interval: float = 0.5, put_timeout: float = 1.0):
+        self.vector_memory = vector_memory
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="vector-memory-writer", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def submit(self, user_message: str, ai_message: str, context: Dict[str, Any] = None) -> None:
+        # Allocated now, so entries keep the order the turns happened in
+        turn = (user_message, ai_message, context, new_entry_id())
+        if self._closed:
+            self._write([turn])
+            return
+        try:
+            self._queue.put(turn, timeout=self.put_timeout)
+        except queue.Full:
+            print("Vector memory write queue is full, writing synchronously")
+            self._write([turn])
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def flush(self) -> None:
+        """Block until everything submitted so far has been written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                self._queue.task_done()
+                return
+
+            batch = [first]
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            try:
+                self._write(batch)
+            finally:
+                for _ in range(len(batch) + (1 if stop else 0)):
+                    self._queue.task_done()
+
+            if stop:
+                return
+
+    def _write(self, batch) -> None:
+        try:
+            self.vector_memory.add_conversations([turn[:3] for turn in batch], ids=[turn[3] for turn in batch])
+        except Exception as e:
+            print(f"Error writing {len(batch)} turns to vector memory, retrying individually: {e}")
+            for turn in batch:
+                try:
+                    self.vector_memory.add_conversations([turn[:3]], ids=[turn[3]])
+                except Exception as item_error:
+                    print(f"Dropping turn after failed retry: {item_error}")
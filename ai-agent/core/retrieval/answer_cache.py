@@ -0,0 +1,155 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Sequence
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", 512))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", 3600))
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", 0.92))
+
+class AnswerCache:
+    """Semantic cache of document answers, keyed by the question embedding.
+
+    A question is a hit when a cached question asked in the same `scope` (e.g. k and
+    any retrieval filters) has cosine similarity >= `threshold`, so rewordings of the
+    same question reuse one answer.
+    Each entry remembers the chunk IDs its answer was generated from;
+    `invalidate_chunks` drops every entry built on a chunk that was re-ingested or
+    deleted. Entries expire after `ttl_seconds` (which also bounds how long an answer
+    can miss newly added documents) and the least recently used ones are evicted
+    beyond `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = ANSWER_CACHE_MAX_ENTRIES, ttl_seconds: float = ANSWER_CACHE_TTL,
+                 threshold: float = ANSWER_CACHE_THRESHOLD):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[int, Dict]" = OrderedDict()
+        self._by_chunk: Dict[str, set] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        # Row-normalized question vectors of all entries, rebuilt lazily after changes
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_ids: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, vector: Sequence[float], scope: Hashable) -> Optional[str]:
+        """Return the cached answer for the most similar question, or None."""
+        query = self._normalize(vector)
+        with self._lock:
+            self._expire()
+            entry = self._best_match(query, scope)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(entry["id"])
+            self.hits += 1
+            return entry["answer"]
+
+    def put(self, question: str, vector: Sequence[float], scope: Hashable, answer: str, chunk_ids: Sequence[str]) -> None:
+        entry = {
+            "id": None,
+            "question": question,
+            "vector": self._normalize(vector),
+            "scope": scope,
+            "answer": answer,
+            "chunk_ids": [chunk_id for chunk_id in chunk_ids if chunk_id],
+            "created": time.time()
+        }
+        with self._lock:
+            # A near-identical question replaces its older entry instead of adding a twin
+            previous = self._best_match(entry["vector"], scope)
+            if previous is not None:
+                self._remove(previous["id"])
+
+            entry["id"] = self._next_id
+            self._next_id += 1
+            self._entries[entry["id"]] = entry
+            for chunk_id in entry["chunk_ids"]:
+                self._by_chunk.setdefault(chunk_id, set()).add(entry["id"])
+            self._matrix = None
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_chunks(self, chunk_ids: Sequence[str]) -> int:
+        """Drop entries whose answers used any of these chunks; returns how many were dropped."""
+        with self._lock:
+            entry_ids = set()
+            for chunk_id in chunk_ids:
+                entry_ids.update(self._by_chunk.get(chunk_id, ()))
+            for entry_id in entry_ids:
+                self._remove(entry_id)
+            self.invalidations += len(entry_ids)
+            return len(entry_ids)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_chunk.clear()
+            self._matrix = None
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions
+        }
+
+    def _best_match(self, query: np.ndarray, scope: Hashable) -> Optional[Dict]:
+        if not self._entries:
+            return None
+        if self._matrix is None:
+            self._matrix_ids = list(self._entries)
+            self._matrix = np.vstack([self._entries[entry_id]["vector"] for entry_id in self._matrix_ids])
+
+        scores = self._matrix @ query
+        # Best candidates first; usually the first one that is above the threshold in the same scope wins
+        for i in np.argsort(-scores):
+            if scores[i] < self.threshold:
+                return None
+            entry = self._entries[self._matrix_ids[i]]
+            if entry["scope"] == scope:
+                return entry
+        return None
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.ttl_seconds
+        expired = [entry_id for entry_id, entry in self._entries.items() if entry["created"] < cutoff]
+        for entry_id in expired:
+            self._remove(entry_id)
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for chunk_id in entry["chunk_ids"]:
+            ids = self._by_chunk.get(chunk_id)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self._by_chunk[chunk_id]
+        self._matrix = None
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
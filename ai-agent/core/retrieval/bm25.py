@@ -0,0 +1,97 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be but by can could did do does for from had has have he her his how i if in
+is it its me my of on or our say said she so tell that the their them then there these they this
+to told us was we were what when where which who why will with would you your about ai user
+""".split())
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens with common stopwords removed."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+class BM25Index:
+    """Incremental in-memory inverted index with Okapi BM25 scoring.
+
+    Documents can be added, replaced and removed one at a time; collection statistics
+    (document frequencies, average length) are maintained as they change, so there is
+    no rebuild step.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._doc_terms: Dict[str, Counter] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def add(self, doc_id: str, text: str) -> None:
+        if doc_id in self._doc_terms:
+            self.remove(doc_id)
+
+        terms = Counter(tokenize(text))
+        self._doc_terms[doc_id] = terms
+        self._doc_lengths[doc_id] = sum(terms.values())
+        self._total_length += self._doc_lengths[doc_id]
+        for term, frequency in terms.items():
+            self._postings[term][doc_id] = frequency
+
+    def remove(self, doc_id: str) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._doc_terms.clear()
+        self._doc_lengths.clear()
+        self._total_length = 0
+
+    def idf(self, term: str) -> float:
+        document_frequency = len(self._postings.get(term, ()))
+        return math.log(1 + (len(self._doc_terms) - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Return up to k (doc_id, BM25 score) pairs, best first."""
+        if not self._doc_terms:
+            return []
+
+        average_length = self._total_length / len(self._doc_terms) or 1.0
+        scores: Dict[str, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for doc_id, frequency in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / average_length)
+                scores[doc_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def coverage(self, query: str, doc_id: str) -> float:
+        """IDF-weighted fraction of the query's terms that occur in the document (0..1)."""
+        terms = set(tokenize(query))
+        doc_terms = self._doc_terms.get(doc_id)
+        if not terms or doc_terms is None:
+            return 0.0
+
+        weights = {term: self.idf(term) for term in terms}
+        total = sum(weights.values())
+        matched = sum(weight for term, weight in weights.items() if term in doc_terms)
+        return matched / total if total else 0.0
@@ -0,0 +1,102 @@
+import os
+import re
+from typing import Dict, List, Sequence, Tuple
+from langchain_core.documents import Document
+from core.utils.tokens import estimate_tokens
+
+_WHITESPACE = re.compile(r"[ \t\f\v]+")
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+# Chunks at most this many characters apart count as adjacent (split on whitespace)
+_ADJACENT_GAP = 2
+
+def clean_text(text: str) -> str:
+    """Collapse runs of spaces and blank lines left over from PDF extraction."""
+    text = _WHITESPACE.sub(" ", text.replace("\r", ""))
+    text = _BLANK_LINES.sub("\n\n", text)
+    return "\n".join(line.strip() for line in text.split("\n")).strip()
+
+def merge_chunks(docs: Sequence[Document]) -> List[Tuple[int, Document]]:
+    """Merge overlapping or adjacent chunks of the same source (and page).
+
+    `docs` are in rank order; each returned (rank, passage) keeps the best rank of the
+    chunks it was merged from. Chunks need the splitter's `start_index` metadata to be
+    placed; chunks without it are passed through unmerged.
+    """
+    groups: Dict[Tuple, List[Tuple[int, Document]]] = {}
+    passages: List[Tuple[int, Document]] = []
+    for rank, doc in enumerate(docs):
+        if doc.metadata.get("start_index") is None:
+            passages.append((rank, doc))
+        else:
+            key = (doc.metadata.get("source"), doc.metadata.get("page"))
+            groups.setdefault(key, []).append((rank, doc))
+
+    for members in groups.values():
+        members.sort(key=lambda member: member[1].metadata["start_index"])
+        rank, current = members[0]
+        text = current.page_content
+        # Character offset (in the source page) where the merged text ends
+        end = current.metadata["start_index"] + len(text)
+        for next_rank, doc in members[1:]:
+            next_start = doc.metadata["start_index"]
+            next_end = next_start + len(doc.page_content)
+            if next_start <= end:
+                # Overlapping: append only the part that is not already there
+                text += doc.page_content[end - next_start:]
+            elif next_start - end <= _ADJACENT_GAP:
+                # Adjacent: the splitter only dropped the whitespace between them
+                text += "\n" + doc.page_content
+            else:
+                passages.append((rank, Document(page_content=text, metadata=current.metadata)))
+                rank, current, text, end = next_rank, doc, doc.page_content, next_end
+                continue
+            rank = min(rank, next_rank)
+            end = max(end, next_end)
+        passages.append((rank, Document(page_content=text, metadata=current.metadata)))
+
+    passages.sort(key=lambda passage: passage[0])
+    return passages
+
+def pack_context(docs: Sequence[Document], max_tokens: int, min_tokens: int = 50) -> str:
+    """Render retrieved chunks as a compact, token-budgeted context string.
+
+    Overlapping and adjacent chunks are merged, whitespace is normalized, and the
+    passages are emitted best-ranked first under a short `[n] file (page)` header
+    until `max_tokens` is reached. The passage that crosses the budget is cut at a
+    word boundary if at least `min_tokens` of room is left, otherwise dropped.
+    """
+    parts = []
+    used = 0
+    for number, (_, doc) in enumerate(merge_chunks(docs), start=1):
+        header = f"[{number}] {_label(doc.metadata)}"
+        text = clean_text(doc.page_content)
+        if not text:
+            continue
+
+        tokens = estimate_tokens(header) + estimate_tokens(text) + 1
+        if used + tokens > max_tokens:
+            room = max_tokens - used - estimate_tokens(header) - 1
+            if room < min_tokens:
+                break
+            text = _truncate(text, room)
+            tokens = max_tokens - used
+        parts.append(f"{header}\n{text}")
+        used += tokens
+        if used >= max_tokens:
+            break
+    return "\n\n".join(parts)
+
+def _label(metadata: Dict) -> str:
+    label = os.path.basename(metadata.get("source") or "document")
+    page = metadata.get("page")
+    if page is not None:
+        label += f" (page {int(page) + 1})"
+    return label
+
+def _truncate(text: str, max_tokens: int) -> str:
+    # estimate_tokens is ~4 characters per token for long text
+    cut = text[:max_tokens * 4]
+    if len(cut) < len(text):
+        space = cut.rfind(" ")
+        cut = (cut[:space] if space > 0 else cut) + " ..."
+    return cut
@@ -0,0 +1,225 @@
+import os
+import re
+import json
+import base64
+import zlib
+import threading
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from langchain_core.documents import Document
+
+# Hash universe for the permutations; a*x + b stays below 2**62, so uint64 never overflows
+_PRIME = (1 << 31) - 1
+
+def shingles(text: str, size: int = 3) -> set:
+    """Word n-grams of a text, the set whose Jaccard similarity MinHash estimates."""
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+class MinHasher:
+    """MinHash signatures over word shingles; matching positions estimate Jaccard similarity."""
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 3, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._a = rng.randint(1, _PRIME, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, _PRIME, size=num_perm).astype(np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) & _PRIME for s in shingles(text, self.shingle_size)),
+                             dtype=np.uint64)
+        if hashes.size == 0:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint32)
+        return ((np.outer(hashes, self._a) + self._b) % _PRIME).min(axis=0).astype(np.uint32)
+
+    @staticmethod
+    def similarity(a: np.ndarray, b: np.ndarray) -> float:
+        return float(np.mean(a == b))
+
+class DedupIndex:
+    """LSH index of MinHash signatures for stored chunks, plus their provenance.
+
+    `find` returns a stored chunk whose estimated Jaccard similarity with a new chunk
+    is at least `threshold`; LSH banding (`bands` x rows) keeps that to a handful of
+    bucket lookups instead of a scan. Every stored chunk keeps the list of source
+    files that contain it (`refs`), so a near-duplicate only adds a reference, and a
+    chunk is deleted only once no source refers to it any more.
+    """
+
+    def __init__(self, path: Optional[str] = None, threshold: float = 0.8, num_perm: int = 64, bands: int = 16):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.path = path
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._refs: Dict[str, List[str]] = {}
+        self._buckets: List[Dict[bytes, set]] = [{} for _ in range(bands)]
+        self._lock = threading.RLock()
+        if path:
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self._signatures
+
+    def signature(self, text: str) -> np.ndarray:
+        return self.hasher.signature(text)
+
+    def find(self, signature: np.ndarray, exclude_source: Optional[str] = None) -> Optional[str]:
+        """The most similar stored chunk at or above the threshold, or None.
+
+        Chunks whose only source is `exclude_source` are skipped, so a changed file is
+        never matched against its own previous chunks.
+        """
+        with self._lock:
+            candidates = set()
+            for band, key in enumerate(self._band_keys(signature)):
+                candidates.update(self._buckets[band].get(key, ()))
+
+            best, best_score = None, self.threshold
+            for chunk_id in sorted(candidates):
+                if exclude_source is not None and self._refs.get(chunk_id) == [exclude_source]:
+                    continue
+                score = MinHasher.similarity(signature, self._signatures[chunk_id])
+                if score >= best_score:
+                    best, best_score = chunk_id, score
+            return best
+
+    def add(self, chunk_id: str, signature: np.ndarray, source: str) -> None:
+        """Index a stored chunk (or add `source` to an already indexed one)."""
+        with self._lock:
+            if chunk_id not in self._signatures:
+                self._signatures[chunk_id] = signature
+                for band, key in enumerate(self._band_keys(signature)):
+                    self._buckets[band].setdefault(key, set()).add(chunk_id)
+            self.add_ref(chunk_id, source)
+
+    def add_ref(self, chunk_id: str, source: str) -> None:
+        with self._lock:
+            refs = self._refs.setdefault(chunk_id, [])
+            if source not in refs:
+                refs.append(source)
+
+    def sources(self, chunk_id: str) -> List[str]:
+        with self._lock:
+            return list(self._refs.get(chunk_id, ()))
+
+    def release(self, chunk_id: str, source: str) -> List[str]:
+        """Drop `source`'s reference to a chunk; returns the sources still referring to it.
+        An empty list means the chunk can be deleted (and it is removed from the index)."""
+        with self._lock:
+            refs = self._refs.get(chunk_id, [])
+            if source in refs:
+                refs.remove(source)
+            if refs:
+                return list(refs)
+            self._remove(chunk_id)
+            return []
+
+    def release_source(self, source: str, keep: Sequence[str] = ()) -> List[str]:
+        """Drop all of `source`'s references except `keep`; returns the chunks left unreferenced."""
+        keep = set(keep)
+        with self._lock:
+            orphans = []
+            for chunk_id in [chunk_id for chunk_id, refs in self._refs.items() if source in refs and chunk_id not in keep]:
+                if not self.release(chunk_id, source):
+                    orphans.append(chunk_id)
+            return orphans
+
+    def load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable dedup index {self.path}: {e}")
+            return
+
+        with self._lock:
+            for chunk_id, encoded in data.get("signatures", {}).items():
+                signature = np.frombuffer(base64.b64decode(encoded), dtype=np.uint32)
+                if signature.size != self.hasher.num_perm:
+                    continue
+                self._signatures[chunk_id] = signature
+                for band, key in enumerate(self._band_keys(signature)):
+                    self._buckets[band].setdefault(key, set()).add(chunk_id)
+            self._refs = {chunk_id: refs for chunk_id, refs in data.get("refs", {}).items() if refs}
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            data = {
+                "signatures": {chunk_id: base64.b64encode(signature.tobytes()).decode("ascii")
+                               for chunk_id, signature in self._signatures.items()},
+                "refs": self._refs
+            }
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+
+    def _remove(self, chunk_id: str) -> None:
+        self._refs.pop(chunk_id, None)
+        signature = self._signatures.pop(chunk_id, None)
+        if signature is None:
+            return
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(chunk_id)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+def dedupe_documents(docs: Sequence[Document], k: int, threshold: float = 0.8,
+                     hasher: Optional[MinHasher] = None) -> List[Document]:
+    """Keep the first (best ranked) of each group of near-duplicate documents, up to k.
+
+    The sources of dropped copies are merged into the kept document's `sources` metadata.
+    """
+    hasher = hasher or _default_hasher
+    kept, signatures = [], []
+    for doc in docs:
+        signature = hasher.signature(doc.page_content)
+        match = next((i for i, other in enumerate(signatures) if MinHasher.similarity(signature, other) >= threshold), None)
+        if match is None:
+            if len(kept) < k:
+                kept.append(doc)
+                signatures.append(signature)
+            continue
+
+        sources = document_sources(kept[match])
+        for source in document_sources(doc):
+            if source not in sources:
+                sources.append(source)
+        kept[match] = Document(page_content=kept[match].page_content, id=kept[match].id,
+                               metadata={**kept[match].metadata, "sources": json.dumps(sources)})
+    return kept
+
+def document_sources(doc: Document) -> List[str]:
+    """All source files of a (possibly deduplicated) chunk."""
+    try:
+        sources = json.loads(doc.metadata.get("sources") or "[]")
+    except ValueError:
+        sources = []
+    source = doc.metadata.get("source")
+    if source and source not in sources:
+        sources.insert(0, source)
+    return sources
+
+_default_hasher = MinHasher()
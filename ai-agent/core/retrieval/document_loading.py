@@ -0,0 +1,74 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Iterator, List, Optional, Sequence, Tuple
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document
+from langchain_community.document_loaders import PyPDFLoader, TextLoader
+from .ingest_manifest import chunk_id
+
+# (path, chunks, chunk_ids, error); error is None on success
+LoadResult = Tuple[str, List[Document], List[str], Optional[str]]
+
+# Bump when the metadata recorded on chunks (or manifest entries) changes, so files ingested earlier are redone
+METADATA_VERSION = 4
+
+# File types load_document reads, as recorded in chunk metadata
+FILE_TYPES = ("pdf", "txt")
+
+def file_type(fpath: str) -> str:
+    return os.path.splitext(fpath)[1].lower().lstrip(".")
+
+def load_document(fpath: str) -> List[Document]:
+    """Load one PDF or TXT file as LangChain Documents."""
+    if fpath.lower().endswith('.pdf'):
+        return PyPDFLoader(fpath).load()
+    return TextLoader(fpath, autodetect_encoding=True).load()
+
+@lru_cache(maxsize=None)
+def _splitter(chunk_size: int, chunk_overlap: int) -> RecursiveCharacterTextSplitter:
+    # start_index lets context packing merge overlapping and adjacent chunks at query time
+    return RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap, add_start_index=True)
+
+def load_and_split_file(fpath: str, chunk_size: int, chunk_overlap: int) -> LoadResult:
+    """Load and split one file into chunks with deterministic IDs.
+
+    Runs in pool workers, so it only depends on this light module, and it returns
+    errors instead of raising so one bad file cannot fail the whole batch.
+    """
+    try:
+        chunks = _splitter(chunk_size, chunk_overlap).split_documents(load_document(fpath))
+        # Filterable at query time, next to the loader's source (and page for PDFs)
+        file_name = os.path.basename(fpath)
+        chunk_type = file_type(fpath)
+        for chunk in chunks:
+            chunk.metadata["file_name"] = file_name
+            chunk.metadata["file_type"] = chunk_type
+        return fpath, chunks, [chunk_id(fpath, i, chunk.page_content) for i, chunk in enumerate(chunks)], None
+    except Exception as e:
+        return fpath, [], [], str(e)
+
+def load_and_split_files(paths: Sequence[str], chunk_size: int, chunk_overlap: int,
+                         workers: int = 0) -> Iterator[LoadResult]:
+    """Yield a LoadResult per path, in the order of `paths`.
+
+    With `workers` > 1, parsing and splitting are spread over a process pool (PDF
+    parsing is CPU-bound and holds the GIL, so threads would not help).
+    """
+    if workers <= 1 or len(paths) <= 1:
+        for fpath in paths:
+            yield load_and_split_file(fpath, chunk_size, chunk_overlap)
+        return
+
+    workers = min(workers, len(paths), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # A sliding window of futures keeps results in order while bounding how many
+        # parsed files can pile up when the consumer is slower than the workers
+        window = deque()
+        for fpath in paths:
+            window.append(pool.submit(load_and_split_file, fpath, chunk_size, chunk_overlap))
+            if len(window) >= workers * 2:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
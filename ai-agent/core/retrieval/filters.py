@@ -0,0 +1,62 @@
+import os
+from datetime import datetime, time as dt_time
+from typing import Dict, Iterable, List, Optional
+
+def parse_date(value: str, end_of_day: bool = False) -> float:
+    """Epoch seconds for an ISO date or datetime; a bare date means the start (or end) of that day."""
+    value = value.strip()
+    parsed = datetime.fromisoformat(value)
+    if end_of_day and len(value) <= 10:
+        parsed = datetime.combine(parsed.date(), dt_time.max)
+    return parsed.timestamp()
+
+def normalize_file_type(file_type: str) -> str:
+    return file_type.strip().lower().lstrip(".")
+
+def match_sources(paths: Iterable[str], name: str) -> List[str]:
+    """Ingested paths that a user-supplied file name refers to.
+
+    An exact path or file name wins; otherwise every file whose name contains `name`
+    (case-insensitive) matches, so "q3 report" finds "Q3 Report 2024.pdf".
+    """
+    name = name.strip()
+    paths = list(paths)
+    target = os.path.abspath(name)
+    exact = [path for path in paths if path == target or os.path.basename(path).lower() == name.lower()]
+    if exact:
+        return exact
+    needle = name.lower()
+    return [path for path in paths if needle in os.path.basename(path).lower()]
+
+def parse_filters(file_type: Optional[str] = None, since: Optional[str] = None,
+                  until: Optional[str] = None) -> Dict:
+    """Normalized file type and epoch-second bounds; raises ValueError for an unparseable date."""
+    return {
+        "file_type": normalize_file_type(file_type) if file_type else None,
+        "since": parse_date(since) if since else None,
+        "until": parse_date(until, end_of_day=True) if until else None
+    }
+
+def build_where(file_type: Optional[str] = None, since: Optional[float] = None,
+                until: Optional[float] = None) -> Optional[Dict]:
+    """Chroma `where` clause for parsed filters (see parse_filters), or None for no filter.
+
+    A chunk matches through its own `file_type` and `ingested_at`, or, when it is stored
+    once for several near-duplicate files, through any of them: the `source_type_<type>`
+    flags and the `sources_first_ingested`/`sources_last_ingested` range recorded with
+    its provenance. With both `since` and `until`, a shared chunk matches when some source
+    was ingested after `since` and some (possibly another) before `until`.
+    """
+    conditions = []
+    if file_type:
+        conditions.append({"$or": [{"file_type": file_type}, {f"source_type_{file_type}": True}]})
+    if since is not None:
+        conditions.append({"$or": [{"ingested_at": {"$gte": since}}, {"sources_last_ingested": {"$gte": since}}]})
+    if until is not None:
+        conditions.append({"$or": [{"ingested_at": {"$lte": until}}, {"sources_first_ingested": {"$lte": until}}]})
+
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
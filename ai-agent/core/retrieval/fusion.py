@@ -0,0 +1,16 @@
+from collections import defaultdict
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Hashable]], k: int = 60,
+                           weights: Optional[Sequence[float]] = None) -> List[Tuple[Hashable, float]]:
+    """Fuse several ranked ID lists with reciprocal rank fusion (Cormack et al., 2009).
+
+    Each ID scores sum(weight / (k + rank)) over the rankings it appears in, with ranks
+    starting at 1. Returns (id, fused score) pairs, best first.
+    """
+    weights = weights or [1.0] * len(rankings)
+    scores: Dict[Hashable, float] = defaultdict(float)
+    for ranking, weight in zip(rankings, weights):
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] += weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
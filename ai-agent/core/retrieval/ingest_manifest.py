@@ -0,0 +1,88 @@
+import os
+import json
+import hashlib
+import threading
+from typing import Dict, List, Optional
+
+def file_sha256(path: str) -> str:
+    hash_obj = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            hash_obj.update(chunk)
+    return hash_obj.hexdigest()
+
+def chunk_id(source: str, index: int, text: str) -> str:
+    """Deterministic ID for the index-th chunk of a source file, so re-ingesting is idempotent."""
+    digest = hashlib.sha256(f"{source}\0{index}\0{text}".encode("utf-8")).hexdigest()
+    return digest[:32]
+
+class IngestManifest:
+    """Records what has been ingested into the RAG store, one entry per source file:
+    {path: {"size", "mtime", "sha256", "chunk_ids", ...}}, where the ingest pipeline adds
+    "metadata_version" and "ingested_at" (epoch seconds, recorded with shared chunks' provenance).
+
+    A file whose size and mtime are unchanged is trusted without hashing; otherwise its
+    content hash decides whether it really changed (e.g. a `touch` does not re-ingest).
+    The manifest is written atomically, so a crash never leaves a half-written file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except FileNotFoundError:
+            self._entries = {}
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable ingestion manifest {self.path}: {e}")
+            self._entries = {}
+
+    def save(self) -> None:
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+
+    def paths(self) -> List[str]:
+        with self._lock:
+            return list(self._entries)
+
+    def get(self, path: str) -> Optional[Dict]:
+        with self._lock:
+            return self._entries.get(path)
+
+    def set(self, path: str, size: int, mtime: float, sha256: str, chunk_ids: List[str], **extra) -> None:
+        with self._lock:
+            self._entries[path] = {"size": size, "mtime": mtime, "sha256": sha256, "chunk_ids": chunk_ids, **extra}
+
+    def remove(self, path: str) -> Optional[Dict]:
+        with self._lock:
+            return self._entries.pop(path, None)
+
+    def is_unchanged(self, path: str) -> bool:
+        """True if the file matches its manifest entry. Refreshes the recorded mtime when
+        only the timestamp moved, so the file is not hashed again on the next run."""
+        entry = self.get(path)
+        if entry is None:
+            return False
+
+        stat = os.stat(path)
+        if stat.st_size == entry["size"] and stat.st_mtime == entry["mtime"]:
+            return True
+        if stat.st_size != entry["size"]:
+            return False
+
+        if file_sha256(path) == entry["sha256"]:
+            with self._lock:
+                entry["mtime"] = stat.st_mtime
+            return True
+        return False
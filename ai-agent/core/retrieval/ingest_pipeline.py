@@ -0,0 +1,353 @@
+import os
+import json
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from .dedup import DedupIndex
+from .document_loading import FILE_TYPES, METADATA_VERSION, LoadResult, file_type
+from .ingest_manifest import IngestManifest, file_sha256
+
+# progress(files_done, files_total, chunks_done)
+ProgressCallback = Callable[[int, int, int], None]
+
+_DONE = object()
+
+def release_chunks(collection, dedup: Optional[DedupIndex], source: str, chunk_ids: Iterable[str],
+                   manifest: Optional[IngestManifest] = None) -> List[str]:
+    """Drop `source`'s claim on chunks. Chunks no other source shares are deleted (their IDs
+    are returned); shared ones stay, with `source` removed from their provenance (the other
+    sources' ingestion times come from `manifest`)."""
+    chunk_ids = list(chunk_ids)
+    if dedup is None:
+        deleted = chunk_ids
+    else:
+        deleted, shared = [], {}
+        for chunk_id in chunk_ids:
+            remaining = dedup.release(chunk_id, source)
+            if remaining:
+                shared[chunk_id] = _provenance(remaining, manifest)
+            else:
+                deleted.append(chunk_id)
+        if shared:
+            try:
+                collection.update(ids=list(shared), metadatas=list(shared.values()))
+            except Exception as e:
+                print(f"Error updating sources of {len(shared)} shared chunks: {e}")
+    if deleted:
+        collection.delete(ids=deleted)
+    return deleted
+
+def _provenance(sources: List[str], manifest: Optional[IngestManifest] = None,
+                current: Optional[str] = None, ingested_at: Optional[int] = None) -> Dict:
+    """Metadata for a chunk stored once for several files, describing all of them.
+
+    The chunk is described by its first source (`source`, `file_name`, `file_type`,
+    `ingested_at`). Retrieval filters also match it through the others: a
+    `source_type_<type>` flag per file type and the range `sources_first_ingested` to
+    `sources_last_ingested`. Every key is written each time, because Chroma merges
+    metadata on update. Ingestion times come from `manifest`, except for `current`
+    (the file being ingested), which was ingested at `ingested_at`.
+    """
+    times = {}
+    for path in sources:
+        entry = manifest.get(path) if manifest is not None else None
+        when = ingested_at if path == current else (entry or {}).get("ingested_at")
+        if when is not None:
+            times[path] = when
+
+    first = sources[0]
+    metadata = {"source": first, "sources": json.dumps(sources),
+                "file_name": os.path.basename(first), "file_type": file_type(first)}
+    types = {file_type(path) for path in sources}
+    for known in FILE_TYPES:
+        metadata[f"source_type_{known}"] = known in types
+    if first in times:
+        metadata["ingested_at"] = times[first]
+    if times:
+        metadata["sources_first_ingested"] = min(times.values())
+        metadata["sources_last_ingested"] = max(times.values())
+    return metadata
+
+def print_progress(files_done: int, files_total: int, chunks_done: int) -> None:
+    print(f"Ingested {files_done}/{files_total} files ({chunks_done} chunks)")
+
+class IngestPipeline:
+    """Streams loaded files through embedding and into a Chroma collection.
+
+    Three stages run concurrently, connected by bounded queues so a slow stage
+    applies backpressure to the ones before it:
+
+        load/split (thread) -> embed in batches (thread) -> upsert (calling thread)
+
+    Batches of `batch_size` chunks may span several files. At most `queue_size`
+    files and `queue_size` embedded batches are buffered, so
+    memory stays flat however large the folder is, and every batch is searchable
+    as soon as it is upserted.
+
+    With a DedupIndex, near-duplicate chunks (e.g. from revised versions of a report)
+    are collapsed before embedding: the file only gains a reference to the chunk
+    already stored, whose `sources` metadata lists every file containing it. The
+    manifest then records, per file, the chunk IDs it refers to.
+
+    A file is recorded in the manifest only after its last batch has landed, and the
+    manifest is saved every `save_every` files. Chunk IDs are deterministic and
+    writes are upserts, so after a crash the next run simply redoes the files that
+    were not recorded yet (their embeddings mostly come from the embedding cache).
+    """
+
+    def __init__(self, collection, embeddings, manifest: IngestManifest,
+                 batch_size: int = 64, queue_size: int = 4, save_every: int = 20,
+                 progress: Optional[ProgressCallback] = print_progress,
+                 on_chunks_changed: Optional[Callable[[List[str]], None]] = None,
+                 dedup: Optional[DedupIndex] = None):
+        self.collection = collection
+        self.embeddings = embeddings
+        self.manifest = manifest
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.save_every = save_every
+        self.progress = progress
+        # Called with the IDs of chunks that were deleted or (re)written, e.g. to invalidate caches
+        self.on_chunks_changed = on_chunks_changed
+        self.dedup = dedup
+        self._stop = threading.Event()
+        # (referenced chunk IDs, IDs stored by other files) of files whose batches are still arriving
+        self._file_ids: Dict[str, Tuple[List[str], List[str]]] = {}
+        # Epoch seconds of the current run, recorded on every chunk and manifest entry it writes
+        self._ingested_at = 0
+
+    def run(self, results: Iterable[LoadResult], files_total: int) -> Dict[str, int]:
+        """Consume LoadResults (one per file) and return counts of files, chunks and failures."""
+        loaded = queue.Queue(maxsize=self.queue_size)
+        embedded = queue.Queue(maxsize=self.queue_size)
+        self._stop.clear()
+        self._file_ids.clear()
+        self._ingested_at = int(time.time())
+
+        loader = threading.Thread(target=self._load, args=(results, loaded), name="ingest-loader", daemon=True)
+        embedder = threading.Thread(target=self._embed, args=(loaded, embedded), name="ingest-embedder", daemon=True)
+        loader.start()
+        embedder.start()
+
+        stats = {"files": 0, "chunks": 0, "failed": 0}
+        try:
+            self._upsert(embedded, files_total, stats)
+        finally:
+            # On error, unblock the producers and let them exit
+            self._stop.set()
+            loader.join()
+            embedder.join()
+            self._save()
+        return stats
+
+    def _save(self) -> None:
+        self.manifest.save()
+        if self.dedup is not None:
+            self.dedup.save()
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _load(self, results: Iterable[LoadResult], loaded: queue.Queue) -> None:
+        try:
+            for fpath, chunks, ids, error in results:
+                if error:
+                    item = (fpath, [], [], error, [], [])
+                elif self.dedup is not None:
+                    item = self._dedupe(fpath, chunks, ids)
+                else:
+                    item = (fpath, chunks, ids, None, ids, [])
+                if not self._put(loaded, item):
+                    return
+        except Exception as e:
+            print(f"Error loading documents: {e}")
+        finally:
+            self._put(loaded, _DONE)
+
+    def _dedupe(self, fpath: str, chunks, ids: List[str]):
+        """Split a file's chunks into new ones to store and near-duplicates of other files' chunks."""
+        kept_chunks, kept_ids, refs, duplicates = [], [], [], []
+        for chunk, chunk_id in zip(chunks, ids):
+            signature = self.dedup.signature(chunk.page_content)
+            # Only chunks other files refer to; an edited chunk must replace its old version
+            canonical = self.dedup.find(signature, exclude_source=fpath)
+            if canonical is None or canonical == chunk_id:
+                self.dedup.add(chunk_id, signature, fpath)
+                kept_chunks.append(chunk)
+                kept_ids.append(chunk_id)
+                refs.append(chunk_id)
+            else:
+                self.dedup.add_ref(canonical, fpath)
+                refs.append(canonical)
+                duplicates.append(canonical)
+        refs = list(dict.fromkeys(refs))
+        duplicates = [chunk_id for chunk_id in dict.fromkeys(duplicates) if chunk_id not in kept_ids]
+        return fpath, kept_chunks, kept_ids, None, refs, duplicates
+
+    def _embed(self, loaded: queue.Queue, embedded: queue.Queue) -> None:
+        # A batch packs segments (consecutive chunks of one file) from as many files as
+        # fit in `batch_size`, so folders of small files still embed in full requests
+        segments, size = [], 0
+        while True:
+            item = self._get(loaded)
+            if item is _DONE:
+                if segments:
+                    self._send_batch(segments, embedded)
+                self._put(embedded, _DONE)
+                return
+
+            fpath, chunks, ids, error, refs, duplicates = item
+            if error:
+                self._put(embedded, {"errors": {fpath: error}})
+                continue
+
+            # An empty file still gets an (empty) segment so its manifest entry is written
+            start = 0
+            while True:
+                take = min(self.batch_size - size, len(chunks) - start)
+                segments.append({
+                    "path": fpath,
+                    "file_ids": refs if start == 0 else None,
+                    "duplicates": duplicates if start == 0 else None,
+                    "ids": ids[start:start + take],
+                    "chunks": chunks[start:start + take],
+                    "last": start + take >= len(chunks)
+                })
+                start += take
+                size += take
+                if size >= self.batch_size:
+                    if not self._send_batch(segments, embedded):
+                        return
+                    segments, size = [], 0
+                if start >= len(chunks):
+                    break
+
+    def _send_batch(self, segments: List[Dict], embedded: queue.Queue) -> bool:
+        texts = [chunk.page_content for segment in segments for chunk in segment["chunks"]]
+        try:
+            vectors = self.embeddings.embed_documents(texts) if texts else []
+        except Exception as e:
+            return self._put(embedded, {"errors": {segment["path"]: f"embedding failed: {e}" for segment in segments}})
+        return self._put(embedded, {"segments": segments, "vectors": vectors})
+
+    def _upsert(self, embedded: queue.Queue, files_total: int, stats: Dict[str, int]) -> None:
+        failed = set()
+        last_save = time.monotonic()
+
+        while True:
+            batch = self._get(embedded)
+            if batch is _DONE:
+                return
+
+            if "errors" in batch:
+                for fpath, error in batch["errors"].items():
+                    self._fail(fpath, error, failed, stats)
+                continue
+
+            segments = [segment for segment in batch["segments"] if segment["path"] not in failed]
+            try:
+                for segment in segments:
+                    if segment["file_ids"] is not None:
+                        self._file_ids[segment["path"]] = (segment["file_ids"], segment["duplicates"])
+                        previous = self.manifest.get(segment["path"])
+                        current = set(segment["file_ids"])
+                        stale = [chunk_id for chunk_id in previous["chunk_ids"] if chunk_id not in current] if previous else []
+                        if stale:
+                            self._changed(release_chunks(self.collection, self.dedup, segment["path"], stale, self.manifest))
+
+                vectors = iter(batch["vectors"])
+                ids, documents, metadatas, embeddings = [], [], [], []
+                for segment in batch["segments"]:
+                    for chunk_id, chunk in zip(segment["ids"], segment["chunks"]):
+                        vector = next(vectors)
+                        if segment["path"] in failed:
+                            continue
+                        ids.append(chunk_id)
+                        documents.append(chunk.page_content)
+                        metadatas.append(self._metadata(chunk_id, chunk.metadata))
+                        embeddings.append(vector)
+                if ids:
+                    self.collection.upsert(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+                    self._changed(ids)
+                stats["chunks"] += len(ids)
+            except Exception as e:
+                for segment in segments:
+                    self._fail(segment["path"], str(e), failed, stats)
+                continue
+
+            for segment in segments:
+                if not segment["last"]:
+                    continue
+                fpath = segment["path"]
+                try:
+                    file_ids, duplicates = self._file_ids.pop(fpath)
+                    # Chunks stored by other files now have this file among their sources too
+                    if duplicates:
+                        self.collection.update(ids=duplicates,
+                                               metadatas=[_provenance(self.dedup.sources(chunk_id), self.manifest, fpath, self._ingested_at)
+                                                          for chunk_id in duplicates])
+                    stat = os.stat(fpath)
+                    self.manifest.set(fpath, stat.st_size, stat.st_mtime, file_sha256(fpath), file_ids,
+                                      metadata_version=METADATA_VERSION, ingested_at=self._ingested_at)
+                except Exception as e:
+                    self._fail(fpath, str(e), failed, stats)
+                    continue
+                stats["files"] += 1
+                if self.progress:
+                    self.progress(stats["files"], files_total, stats["chunks"])
+                if stats["files"] % self.save_every == 0 or time.monotonic() - last_save > 10:
+                    self._save()
+                    last_save = time.monotonic()
+
+    def _changed(self, chunk_ids: List[str]) -> None:
+        if self.on_chunks_changed is not None:
+            try:
+                self.on_chunks_changed(chunk_ids)
+            except Exception as e:
+                print(f"Error in chunk change callback: {e}")
+
+    def _fail(self, fpath: str, error: str, failed: set, stats: Dict[str, int]) -> None:
+        if fpath in failed:
+            return
+        print(f"Error ingesting file {os.path.basename(fpath)}: {error}")
+        failed.add(fpath)
+        stats["failed"] += 1
+        self._file_ids.pop(fpath, None)
+
+        if self.dedup is not None:
+            # Back out the references this run added; chunks only it referred to may be half-written
+            previous = self.manifest.get(fpath)
+            orphans = self.dedup.release_source(fpath, keep=previous["chunk_ids"] if previous else ())
+            if orphans:
+                try:
+                    self.collection.delete(ids=orphans)
+                except Exception as e:
+                    print(f"Error removing chunks of failed file {os.path.basename(fpath)}: {e}")
+
+    def _metadata(self, chunk_id: str, metadata: Dict) -> Dict:
+        metadata = _clean_metadata(metadata)
+        metadata["ingested_at"] = self._ingested_at
+        if self.dedup is not None:
+            sources = self.dedup.sources(chunk_id)
+            if len(sources) > 1:
+                metadata.update(_provenance(sources, self.manifest, metadata.get("source"), self._ingested_at))
+        return metadata
+
+def _clean_metadata(metadata: Dict) -> Dict:
+    """Chroma only accepts scalar metadata values."""
+    return {key: value for key, value in metadata.items() if isinstance(value, (str, int, float, bool))}
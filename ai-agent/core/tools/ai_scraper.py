@@ -1,28 +1,33 @@
 from langchain_google_genai import ChatGoogleGenerativeAI
-from browser_use import Agent, BrowserSession, BrowserProfile
 from dotenv import load_dotenv
 from typing import Any, Optional
 import re
+from .lazy import lazy_backend
 
 load_dotenv()
 
 llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash")
 
-browser_profile = BrowserProfile(
-    executable_path=r'C:\Program Files\Google\Chrome\Application\chrome.exe',
-    headless=False,
-    args=[
-        '--disable-gpu',
-        '--no-sandbox',
-        '--disable-web-security',
-        '--disable-features=IsolateOrigins,site-per-process',
-        '--disable-site-isolation-trials'
-    ]
-)
+@lazy_backend("browser")
+def browser_session():
+    # browser_use is slow to import; the browser is only needed once web_automation runs
+    from browser_use import BrowserSession, BrowserProfile
 
-browser_session = BrowserSession(
-    browser_profile=browser_profile,
-)
+    browser_profile = BrowserProfile(
+        executable_path=r'C:\Program Files\Google\Chrome\Application\chrome.exe',
+        headless=False,
+        args=[
+            '--disable-gpu',
+            '--no-sandbox',
+            '--disable-web-security',
+            '--disable-features=IsolateOrigins,site-per-process',
+            '--disable-site-isolation-trials'
+        ]
+    )
+
+    return BrowserSession(
+        browser_profile=browser_profile,
+    )
 
 def split_content(content: list, max_chunk_size: int = 4000) -> list:
     """Split content into smaller chunks while trying to preserve sentence boundaries.
@@ -67,10 +72,11 @@ async def web_automation_task(url: Optional[str], task: str = "extract all conte
         return "Error: URL is required for web automation"
         
     try:
+        from browser_use import Agent
         agent = Agent(
             task=f"{task} from {url}",
             llm=llm,
-            browser_session=browser_session,
+            browser_session=browser_session.get(),
         )
 
         raw_agent_output = await agent.run()
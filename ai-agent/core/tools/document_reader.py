@@ -1,114 +1,420 @@
 import os
+import threading
+from contextlib import contextmanager
 from dotenv import load_dotenv
-from typing import List
+from filelock import FileLock
+from typing import List, Optional
 from langchain_chroma import Chroma
 from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
-from langchain_community.document_loaders import PyPDFLoader, TextLoader
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnableMap
+from langchain_core.runnables import Runnable
+from core.memory.embedding_cache import CachedEmbeddings
+from core.retrieval.answer_cache import AnswerCache
+from core.retrieval.ingest_manifest import IngestManifest
+from core.retrieval.document_loading import METADATA_VERSION, load_and_split_files
+from core.retrieval.context_packing import pack_context
+from core.retrieval.dedup import DedupIndex, dedupe_documents
+from core.retrieval.filters import build_where, match_sources, parse_filters
+from core.retrieval.ingest_pipeline import IngestPipeline, ProgressCallback, print_progress, release_chunks
+from .document_watcher import DocumentWatcher
 
 load_dotenv()
 
 # Path to ChromaDB
 CHROMA_RAG_DB_PATH = os.path.join(os.getenv("VECTOR_DB_PATH", ""), "rag_documents_db")
 COLLECTION_NAME = "intelliAssistant_rag"
+# Which files (and which of their chunks) are already in the collection
+MANIFEST_PATH = os.path.join(CHROMA_RAG_DB_PATH, "ingest_manifest.json")
+SUPPORTED_EXTENSIONS = ('.pdf', '.txt')
+# Processes used to parse and split files; 0 or 1 parses in the calling thread.
+# Off by default because spawn-based platforms (Windows) re-import the entry script in every worker.
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", 0))
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+# Chunks embedded and upserted per batch while ingesting
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", 64))
 
-# Gemini Embeddings and LLM
-embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+# Near-duplicate chunks (estimated Jaccard similarity of word shingles >= DEDUP_THRESHOLD) are
+# stored once with all their source files, at ingest time and again among retrieved results
+INGEST_DEDUP = os.getenv("INGEST_DEDUP", "true").lower() == "true"
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", 0.8))
+DEDUP_INDEX_PATH = os.path.join(CHROMA_RAG_DB_PATH, "dedup_index.json")
+
+# Token budget for the retrieved passages in the RAG prompt (after merging and cleaning them)
+RAG_CONTEXT_TOKENS = int(os.getenv("RAG_CONTEXT_TOKENS", 1200))
+
+# Semantic cache of answers to (reworded) repeat questions, see AnswerCache for its limits
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+
+# Seconds of quiet after the last file event before the watcher re-ingests
+DOCUMENT_WATCH_DEBOUNCE = float(os.getenv("DOCUMENT_WATCH_DEBOUNCE", 2.0))
+
+# Ingestion runs (start-up and watcher) share the manifest, so they run one at a time. main.py
+# and web/server.py both ingest and watch the same folder, so the file lock serializes runs
+# across processes too; each run reloads the manifest and dedup index once it holds the lock.
+_ingest_lock = threading.Lock()
+INGEST_LOCK_PATH = os.path.join(CHROMA_RAG_DB_PATH, "ingest.lock")
+
+@contextmanager
+def _ingesting():
+    with _ingest_lock:
+        os.makedirs(CHROMA_RAG_DB_PATH, exist_ok=True)
+        with FileLock(INGEST_LOCK_PATH):
+            yield
+
+# Gemini Embeddings (behind the shared on-disk embedding cache) and LLM
+embeddings = CachedEmbeddings(GoogleGenerativeAIEmbeddings(model="models/embedding-001"))
 llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash")
 
-# Text splitter
-text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+def list_document_files(folder_path: str) -> List[str]:
+    """Absolute paths of the supported files directly inside a folder, sorted."""
+    return sorted(
+        os.path.abspath(os.path.join(folder_path, fname))
+        for fname in os.listdir(folder_path)
+        if fname.lower().endswith(SUPPORTED_EXTENSIONS)
+    )
+
+def load_documents_from_folder(folder_path: str, workers: int = INGEST_WORKERS) -> List[Document]:
+    """Load and split all PDFs and TXT files from a folder into chunks, as ingestion does.
 
-def load_documents_from_folder(folder_path: str) -> List[Document]:
-    """Load all PDFs and TXT files from a folder as LangChain Documents."""
+    Files go through load_and_split_files, so `workers` > 1 parses them in a process
+    pool; chunks still come back in sorted file order and a file that fails is skipped.
+    """
     docs = []
     try:
         if not os.path.exists(folder_path):
             print(f"Folder not found: {folder_path}")
             return docs
 
-        for fname in os.listdir(folder_path):
-            fpath = os.path.join(folder_path, fname)
-            try:
-                if fname.lower().endswith('.pdf'):
-                    loader = PyPDFLoader(fpath)
-                    docs.extend(loader.load())
-                elif fname.lower().endswith('.txt'):
-                    loader = TextLoader(fpath, autodetect_encoding=True)
-                    docs.extend(loader.load())
-            except Exception as e:
-                print(f"Error loading file {fname}: {e}")
+        for fpath, chunks, _, error in load_and_split_files(list_document_files(folder_path),
+                                                            CHUNK_SIZE, CHUNK_OVERLAP, workers):
+            if error:
+                print(f"Error loading file {os.path.basename(fpath)}: {error}")
+                continue
+            docs.extend(chunks)
     except Exception as e:
         print(f"Error accessing folder {folder_path}: {e}")
     return docs
 
-def ingest_documents(folder_path: str):
-    """Load and ingest documents into ChromaDB with Gemini embeddings."""
+def ingest_documents(folder_path: str, workers: int = INGEST_WORKERS,
+                     progress: Optional[ProgressCallback] = print_progress):
+    """Incrementally ingest a folder into ChromaDB with Gemini embeddings.
+
+    Only new or changed files are loaded, split and embedded. Chunks of changed and
+    deleted files are removed, and chunk IDs are deterministic, so running this again
+    on an unchanged folder only stats the files. Files stream through IngestPipeline
+    in constant memory, and an interrupted run resumes with the files it had not
+    finished.
+    """
     try:
-        docs = load_documents_from_folder(folder_path)
-        if not docs:
-            print("No documents found in the folder.")
+        if not os.path.exists(folder_path):
+            print(f"Folder not found: {folder_path}")
             return
 
-        split_docs = text_splitter.split_documents(docs)
+        with _ingesting():
+            manifest = IngestManifest(MANIFEST_PATH)
+            files = list_document_files(folder_path)
+            folder = os.path.abspath(folder_path)
 
-        try:
-            vectordb = Chroma(
-                collection_name= COLLECTION_NAME,
-                embedding_function=embeddings,
-                persist_directory=CHROMA_RAG_DB_PATH
-            )
-            vectordb.add_documents(split_docs)
-            print(f"Ingested {len(split_docs)} chunks from {len(docs)} documents into RAG DB.")
-        except Exception as e:
-            print(f"Error with Chroma vector store: {e}")
+            # Files that were ingested from this folder but no longer exist
+            deleted = [path for path in manifest.paths()
+                       if os.path.dirname(path) == folder and path not in files]
+            pending = [path for path in files if _needs_ingest(manifest, path)]
+            _sync(manifest, pending, deleted, workers, progress)
     except Exception as e:
         print(f"Document ingestion failed: {e}")
 
-def answer_question(query: str, k: int = 4) -> str:
-    """Answer a question using RAG with Gemini and ChromaDB."""
+def ingest_files(paths: List[str], workers: int = INGEST_WORKERS,
+                 progress: Optional[ProgressCallback] = print_progress):
+    """Incrementally ingest specific files, e.g. the ones a DocumentWatcher saw change.
+
+    Paths that no longer exist are removed from the collection; the rest are
+    re-ingested only if their content changed.
+    """
     try:
-        # Ensure documents are ingested
-        # ingest_documents("ai-agent/public/documents")
+        with _ingesting():
+            manifest = IngestManifest(MANIFEST_PATH)
+            paths = sorted({os.path.abspath(path) for path in paths})
+
+            deleted = [path for path in paths if not os.path.isfile(path) and manifest.get(path) is not None]
+            pending = [path for path in paths
+                       if os.path.isfile(path) and path.lower().endswith(SUPPORTED_EXTENSIONS)
+                       and _needs_ingest(manifest, path)]
+            _sync(manifest, pending, deleted, workers, progress)
+    except Exception as e:
+        print(f"Document ingestion failed: {e}")
+
+def _needs_ingest(manifest: IngestManifest, path: str) -> bool:
+    """New or changed files, and files ingested before the current chunk metadata was recorded."""
+    entry = manifest.get(path)
+    if entry is None or entry.get("metadata_version", 1) < METADATA_VERSION:
+        return True
+    return not manifest.is_unchanged(path)
 
+def _sync(manifest: IngestManifest, pending: List[str], deleted: List[str], workers: int,
+          progress: Optional[ProgressCallback]) -> None:
+    """Remove `deleted` files from the collection and stream `pending` ones into it."""
+    if not deleted and not pending:
+        manifest.save()
+        print("RAG documents are up to date.")
+        return
+
+    try:
         vectordb = Chroma(
-            collection_name=COLLECTION_NAME,
+            collection_name= COLLECTION_NAME,
             embedding_function=embeddings,
             persist_directory=CHROMA_RAG_DB_PATH
         )
+    except Exception as e:
+        print(f"Error with Chroma vector store: {e}")
+        return
 
-        retriever = vectordb.as_retriever(search_kwargs={"k": k})
+    dedup = DedupIndex(DEDUP_INDEX_PATH, threshold=DEDUP_THRESHOLD) if INGEST_DEDUP else None
 
-        # Define prompt
-        prompt = PromptTemplate.from_template(
-            "Use the following context to answer the question.\n\n"
-            "Context:\n{context}\n\n"
-            "Question: {question}"
-        )
+    for path in deleted:
+        entry = manifest.remove(path)
+        if entry and entry["chunk_ids"]:
+            _invalidate_answers(release_chunks(vectordb._collection, dedup, path, entry["chunk_ids"], manifest))
+
+    # load/split -> embed -> upsert run as a streaming pipeline; chunks are searchable as they land
+    pipeline = IngestPipeline(vectordb._collection, embeddings, manifest,
+                              batch_size=INGEST_BATCH_SIZE, progress=progress,
+                              on_chunks_changed=_invalidate_answers, dedup=dedup)
+    stats = pipeline.run(load_and_split_files(pending, CHUNK_SIZE, CHUNK_OVERLAP, workers), len(pending))
+    print(f"Ingested {stats['chunks']} chunks from {stats['files']} changed files "
+          f"({stats['failed']} failed), removed {len(deleted)} deleted files from RAG DB.")
+
+    # Only refresh an engine that is already serving questions; a new one opens the store itself
+    if _rag_engine is not None:
+        _rag_engine.refresh()
+
+def _invalidate_answers(chunk_ids: List[str]) -> None:
+    if _rag_engine is not None:
+        _rag_engine.invalidate(chunk_ids)
+
+def watch_documents(folder_path: str, debounce: float = DOCUMENT_WATCH_DEBOUNCE) -> DocumentWatcher:
+    """Re-ingest files in `folder_path` in the background whenever they are added, changed or removed.
+
+    The watcher only reacts to changes after it starts; call ingest_documents first to
+    catch up with changes made while the process was not running.
+    """
+    watcher = DocumentWatcher(
+        folder_path,
+        on_change=lambda paths: ingest_files(paths, progress=None),
+        extensions=SUPPORTED_EXTENSIONS,
+        debounce=debounce
+    )
+    watcher.start()
+    return watcher
 
-        # Build LCEL RAG chain
-        rag_chain = (
-            RunnableMap({
-                "context": retriever,
-                "question": lambda x: x
-            })
-            | prompt
-            | llm
-            | StrOutputParser()
+RAG_PROMPT = PromptTemplate.from_template(
+    "Use the following context to answer the question.\n\n"
+    "Context:\n{context}\n\n"
+    "Question: {question}"
+)
+
+class RAGEngine:
+    """Long-lived document Q&A: the Chroma store and LCEL chain are built once and
+    reused, instead of reopening the persistent store on every question.
+
+    `refresh()` rebuilds them off to the side and swaps them in, so questions keep
+    being answered while it runs; ingestion calls it after the collection changed.
+
+    Answers are kept in a semantic AnswerCache keyed by the question embedding, so a
+    reworded repeat of a question skips retrieval and generation. Ingestion calls
+    `invalidate()` with the chunk IDs it rewrites or deletes.
+    """
+
+    def __init__(self, k: int = 4, embedding_function=None, chat_model=None,
+                 persist_directory: str = CHROMA_RAG_DB_PATH, collection_name: str = COLLECTION_NAME,
+                 answer_cache: Optional[AnswerCache] = None, use_cache: bool = ANSWER_CACHE_ENABLED):
+        self.k = k
+        self.embedding_function = embedding_function
+        self.chat_model = chat_model
+        self.persist_directory = persist_directory
+        self.collection_name = collection_name
+        self.answer_cache = answer_cache or (AnswerCache() if use_cache else None)
+        self._lock = threading.Lock()
+        self._vectordb = None
+        self._chain: Optional[Runnable] = None
+        self._manifest: Optional[IngestManifest] = None
+
+    def _embeddings(self):
+        # Module globals are looked up at call time so they can be swapped out (e.g. in benchmarks)
+        return self.embedding_function or embeddings
+
+    def _build(self):
+        vectordb = Chroma(
+            collection_name=self.collection_name,
+            embedding_function=self._embeddings(),
+            persist_directory=self.persist_directory
         )
+        chain = RAG_PROMPT | (self.chat_model or llm) | StrOutputParser()
+        # Which chunks belong to which file, for source filters
+        manifest = IngestManifest(os.path.join(self.persist_directory, os.path.basename(MANIFEST_PATH)))
+        return vectordb, chain, manifest
+
+    def _components(self):
+        if self._vectordb is None:
+            with self._lock:
+                if self._vectordb is None:
+                    self._vectordb, self._chain, self._manifest = self._build()
+        return self._vectordb, self._chain, self._manifest
 
+    def warm_up(self) -> None:
+        """Open the store and build the chain ahead of the first question."""
         try:
-            answer = rag_chain.invoke(query)
+            self._components()
+        except Exception as e:
+            print(f"Error warming up RAG engine: {e}")
+
+    def refresh(self) -> None:
+        """Reopen the store and manifest and rebuild the chain, then swap them in atomically."""
+        try:
+            vectordb, chain, manifest = self._build()
+            with self._lock:
+                self._vectordb, self._chain, self._manifest = vectordb, chain, manifest
+        except Exception as e:
+            print(f"Error refreshing RAG engine: {e}")
+
+    def invalidate(self, chunk_ids: List[str]) -> None:
+        """Forget cached answers that were generated from any of these chunks."""
+        if self.answer_cache is not None and chunk_ids:
+            self.answer_cache.invalidate_chunks(chunk_ids)
+
+    def cache_stats(self) -> dict:
+        return self.answer_cache.stats() if self.answer_cache is not None else {}
+
+    def _fetch_k(self, k: int) -> int:
+        # Over-fetch so k distinct passages remain after near-duplicates are collapsed
+        return k * 2 if INGEST_DEDUP else k
+
+    def _dedupe(self, docs: List[Document], k: int) -> List[Document]:
+        return dedupe_documents(docs, k, DEDUP_THRESHOLD) if INGEST_DEDUP else docs[:k]
+
+    def _search_kwargs(self, manifest: IngestManifest, source: Optional[str], filters: dict) -> Optional[dict]:
+        """Chroma query arguments that narrow the candidates before the vector search.
+
+        File type and ingestion date (the parsed `filters`, see parse_filters) become a
+        metadata `where` clause. A source filter becomes the list of chunk IDs the
+        matching files refer to, which also covers chunks stored once for several
+        near-duplicate files. Returns None when `source` matches no ingested file.
+        """
+        kwargs = {}
+        where = build_where(**filters)
+        if where:
+            kwargs["filter"] = where
+        if source:
+            paths = match_sources(manifest.paths(), source)
+            ids = list(dict.fromkeys(chunk_id for path in paths for chunk_id in manifest.get(path)["chunk_ids"]))
+            if not ids:
+                return None
+            kwargs["ids"] = ids
+        return kwargs
+
+    def retrieve(self, question: str, k: Optional[int] = None, source: Optional[str] = None,
+                 file_type: Optional[str] = None, since: Optional[str] = None,
+                 until: Optional[str] = None) -> List[Document]:
+        """Top-k chunks for a question, best first, without generating an answer."""
+        k = k or self.k
+        filters = parse_filters(file_type, since, until)
+        vectordb, _, manifest = self._components()
+        search_kwargs = self._search_kwargs(manifest, source, filters)
+        if search_kwargs is None:
+            return []
+        vector = self._embeddings().embed_query(question)
+        return self._dedupe(vectordb.similarity_search_by_vector(vector, k=self._fetch_k(k), **search_kwargs), k)
+
+    def query(self, question: str, k: Optional[int] = None, source: Optional[str] = None,
+              file_type: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None) -> str:
+        """Answer a question using RAG with Gemini and ChromaDB.
+
+        `source` (a file name or part of one), `file_type` ("pdf", "txt") and the ISO
+        dates `since`/`until` (ingestion time) restrict which chunks are searched.
+        """
+        k = k or self.k
+        scope = (k, source, file_type, since, until)
+        try:
+            filters = parse_filters(file_type, since, until)
+        except ValueError as e:
+            return f"Invalid document filter: {e}"
+        try:
+            vectordb, chain, manifest = self._components()
+            search_kwargs = self._search_kwargs(manifest, source, filters)
+            if search_kwargs is None:
+                return f"No ingested document matches '{source}'."
+            vector = self._embeddings().embed_query(question)
+        except Exception as e:
+            print(f"Error in RAG pipeline: {e}")
+            return "An error occurred during document retrieval or question answering."
+
+        cached = self.answer_cache.get(vector, scope) if self.answer_cache is not None else None
+        if cached is not None:
+            return cached
 
-            return answer
+        try:
+            docs = self._dedupe(vectordb.similarity_search_by_vector(vector, k=self._fetch_k(k), **search_kwargs), k)
+            answer = chain.invoke({"context": pack_context(docs, RAG_CONTEXT_TOKENS), "question": question})
         except Exception as e:
             print(f"Error invoking RAG chain: {e}")
             return "Sorry, there was an error processing your question."
 
-    except Exception as e:
-        print(f"Error in RAG pipeline: {e}")
-        return "An error occurred during document retrieval or question answering."
\ No newline at end of file
+        if self.answer_cache is not None:
+            self.answer_cache.put(question, vector, scope, answer, [doc.id for doc in docs])
+        return answer
+
+    async def aquery(self, question: str, k: Optional[int] = None, source: Optional[str] = None,
+                     file_type: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None) -> str:
+        k = k or self.k
+        scope = (k, source, file_type, since, until)
+        try:
+            filters = parse_filters(file_type, since, until)
+        except ValueError as e:
+            return f"Invalid document filter: {e}"
+        try:
+            vectordb, chain, manifest = self._components()
+            search_kwargs = self._search_kwargs(manifest, source, filters)
+            if search_kwargs is None:
+                return f"No ingested document matches '{source}'."
+            vector = await self._embeddings().aembed_query(question)
+        except Exception as e:
+            print(f"Error in RAG pipeline: {e}")
+            return "An error occurred during document retrieval or question answering."
+
+        cached = self.answer_cache.get(vector, scope) if self.answer_cache is not None else None
+        if cached is not None:
+            return cached
+
+        try:
+            docs = self._dedupe(await vectordb.asimilarity_search_by_vector(vector, k=self._fetch_k(k), **search_kwargs), k)
+            answer = await chain.ainvoke({"context": pack_context(docs, RAG_CONTEXT_TOKENS), "question": question})
+        except Exception as e:
+            print(f"Error invoking RAG chain: {e}")
+            return "Sorry, there was an error processing your question."
+
+        if self.answer_cache is not None:
+            self.answer_cache.put(question, vector, scope, answer, [doc.id for doc in docs])
+        return answer
+
+_rag_engine = None
+_rag_engine_lock = threading.Lock()
+
+def get_rag_engine() -> RAGEngine:
+    """Process-wide RAGEngine shared by the document tools."""
+    global _rag_engine
+    if _rag_engine is None:
+        with _rag_engine_lock:
+            if _rag_engine is None:
+                _rag_engine = RAGEngine()
+    return _rag_engine
+
+def answer_question(query: str, k: int = 4, source: Optional[str] = None, file_type: Optional[str] = None,
+                    since: Optional[str] = None, until: Optional[str] = None) -> str:
+    """Answer a question using RAG with Gemini and ChromaDB, optionally over a subset of documents."""
+    return get_rag_engine().query(query, k, source=source, file_type=file_type, since=since, until=until)
+
+async def aanswer_question(query: str, k: int = 4, source: Optional[str] = None, file_type: Optional[str] = None,
+                           since: Optional[str] = None, until: Optional[str] = None) -> str:
+    return await get_rag_engine().aquery(query, k, source=source, file_type=file_type, since=since, until=until)
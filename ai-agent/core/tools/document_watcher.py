@@ -0,0 +1,74 @@
+import os
+import threading
+from typing import Callable, List, Optional, Sequence
+
+class DocumentWatcher:
+    """Watches a documents folder and reports changed files in debounced batches.
+
+    Events are collected until the folder has been quiet for `debounce` seconds (a
+    copy or an editor save fires several events per file), then `on_change` runs in
+    a background thread with the affected paths, including deleted and renamed ones.
+    Events that arrive while `on_change` is running are batched for the next call.
+    """
+
+    def __init__(self, folder_path: str, on_change: Callable[[List[str]], None],
+                 extensions: Sequence[str] = ('.pdf', '.txt'), debounce: float = 2.0):
+        self.folder_path = os.path.abspath(folder_path)
+        self.on_change = on_change
+        self.extensions = tuple(extensions)
+        self.debounce = debounce
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._fs_tools = None
+
+    def start(self) -> None:
+        # Imported here so document_reader does not pull in the file agent at import time
+        from .file_system_tools import FileSystemTools
+
+        os.makedirs(self.folder_path, exist_ok=True)
+        self._fs_tools = FileSystemTools(base_path=self.folder_path)
+        self._fs_tools.start_watching(self.folder_path, self._on_event)
+        print(f"Watching {self.folder_path} for document changes")
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._pending.clear()
+        if self._fs_tools is not None:
+            self._fs_tools.cleanup()
+            self._fs_tools = None
+
+    def _on_event(self, event) -> None:
+        if event.is_directory:
+            return
+
+        paths = [event.src_path, getattr(event, "dest_path", None)]
+        paths = [os.path.abspath(path) for path in paths
+                 if path and path.lower().endswith(self.extensions)
+                 and os.path.dirname(os.path.abspath(path)) == self.folder_path]
+        if not paths:
+            return
+
+        with self._lock:
+            self._pending.update(paths)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self._flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush(self) -> None:
+        with self._lock:
+            paths = sorted(self._pending)
+            self._pending.clear()
+            self._timer = None
+        if not paths:
+            return
+
+        try:
+            self.on_change(paths)
+        except Exception as e:
+            print(f"Error re-ingesting changed documents: {e}")
@@ -11,6 +11,7 @@ import os
 from dotenv import load_dotenv
 from langgraph.prebuilt import create_react_agent
 from langchain.tools import tool
+from .lazy import lazy_backend
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,8 +23,8 @@ class FileSystemTools:
     
     def __init__(self, base_path: str = None):
         self.base_path = Path(base_path) if base_path else Path.cwd()
-        self.observer = Observer()
-        self.observer.start()
+        # Started by the first start_watching call, so plain file tools need no watcher thread
+        self.observer = None
         self.watched_paths = set()
         self.watch_paths = set()
         
@@ -247,12 +248,14 @@ def get_file_hash(file_path: str, algorithm: str = 'sha256'):
     return file_tools_instance.get_file_hash(file_path, algorithm)
 
 
-llm = ChatGoogleGenerativeAI(
-    api_key=os.getenv("GOOGLE_API_KEY"),
-    model="gemini-2.5-flash-preview-04-17",
-    temperature=0.7
-)
-
 file_tools = [list_directory, read_file, write_file, delete_file, create_directory, move_file, copy_file, get_file_hash]
 
-file_langgraph_agent = create_react_agent(llm, file_tools)
\ No newline at end of file
+# Built on the first file_management call
+@lazy_backend("file_agent")
+def file_langgraph_agent():
+    llm = ChatGoogleGenerativeAI(
+        api_key=os.getenv("GOOGLE_API_KEY"),
+        model="gemini-2.5-flash-preview-04-17",
+        temperature=0.7
+    )
+    return create_react_agent(llm, file_tools)
@@ -1,21 +1,11 @@
-from .object_detection import gemini_client
-import pyautogui
-
-try:
-    geminiClient = gemini_client
-    GEMINI_VISION_MODEL_NAME = "gemini-2.5-flash-preview-04-17" 
-    GEMINI_AVAILABLE = True
-
-except Exception as e:
-    geminiClient = None
-    GEMINI_AVAILABLE = False
-    print(f"Warning: Gemini API not configured for vision: {e}")
-    print("Gemini image processing functionality will be disabled.")
+from .object_detection import gemini_client, GEMINI_VISION_MODEL_NAME
 
 def analyze_image(query: str) -> dict:
+    import pyautogui
     frame = pyautogui.screenshot()
 
-    if GEMINI_AVAILABLE and query:
+    geminiClient = gemini_client.get()
+    if geminiClient is not None and query:
         try:
             image = frame
             contents = [query, image]
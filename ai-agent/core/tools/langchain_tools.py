@@ -15,17 +15,13 @@ from langchain_community.utilities import (
     WikipediaAPIWrapper,
 )
 from .image_generation import generate_image
-from .document_reader import answer_question
-from .process_tools import ProcessTools
-from .file_system_tools import FileSystemTools
+from .tool_cache import cached_tool, fold_args
+from .document_reader import get_rag_engine
 from core.tools.process_tools import process_langgraph_agent
 from core.tools.file_system_tools import file_langgraph_agent
 
 load_dotenv()
 
-process_tools = ProcessTools()
-fs_tools = FileSystemTools()
-
 @tool
 def open_app(app_name: str):
     """Opens a desktop or web application based on the provided app name."""
@@ -40,6 +36,7 @@ def open_app(app_name: str):
         return {"result": f"Failed to open {app_name}: {str(e)}"}
 
 @tool
+@cached_tool(ttl=3600)
 def google_search(query: str) -> dict:
     """Searches Google (via Serper API) for the provided query or topic."""
     try:
@@ -50,6 +47,7 @@ def google_search(query: str) -> dict:
         return {"error": str(e)}
 
 @tool
+@cached_tool(ttl=24 * 3600)
 def wikipedia(query: str) -> Any:
     """Searches Wkipedia for the provided query or topic."""
     try:
@@ -60,6 +58,7 @@ def wikipedia(query: str) -> Any:
         return {"error": str(e)}
     
 @tool
+@cached_tool(ttl=24 * 3600)
 def math_calc(query: str) -> dict:
     """Solve complex math, science, and computational problems. Input should be a precise question."""
 
@@ -76,6 +75,8 @@ def send_whatsApp_message(query: str) -> dict:
     return get_message_for_whatsapp(query)
 
 @tool
+@cached_tool(ttl=900, cacheable=lambda result: isinstance(result, dict) and "result" in result,
+             normalize=fold_args)
 def get_news(
     query: str,
     from_date: Optional[str] = None,
@@ -144,10 +145,8 @@ def get_current_time() -> str:
 def recall_context(query: str) -> dict:
     """Recall relevant information from previous conversations when user refers to past discussions. Use phrases like 'remember when', 'as we discussed', etc. Whenever you feel that the user might be taking past conversation as its current referrence the use this tool.
     Use your reasoning to know when could a user refer past conversation and call this tool"""
-    
-    from core.memory.chat_history import ChatHistory
-    chat_history_manager = ChatHistory()
-    return chat_history_manager.get_relevant_context(query, k=3)
+    from core.memory.service import get_chat_history
+    return get_chat_history().get_relevant_context(query, k=3)
 
 @tool
 def object_detection_visual(query: str) -> dict:
@@ -199,6 +198,8 @@ def screenshot():
         return {"result": f"Screenshot failed: {str(e)}"}
 
 @tool
+@cached_tool(ttl=600, cacheable=lambda result: not str(result["result"]).startswith("Weather check failed"),
+             normalize=fold_args)
 def weather(city: str) -> str:
     """Fetches weather information for a specified city."""
     from core.utils.weather import get_weather
@@ -311,11 +312,23 @@ def get_base64_image_from_public(filename: str) -> str:
         return {"error": str(e)}
 
 @tool
-def ask_document_question(question: str) -> dict:
-    """Answers a question by searching all ingested documents (PDFs, text files) using RAG and Gemini LLM. Returns a synthesized answer with sources."""
+def ask_document_question(
+    question: str,
+    source: Optional[str] = None,
+    file_type: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None
+) -> dict:
+    """Answers a question by searching the ingested documents (PDFs, text files) using RAG and Gemini LLM. Returns a synthesized answer with sources.
 
+    Args:
+        question: The question to answer
+        source: Optional file name (or part of one) to search only that document
+        file_type: Optional file type to search, e.g. "pdf" or "txt"
+        since: Optional YYYY-MM-DD; only documents ingested on or after this date
+        until: Optional YYYY-MM-DD; only documents ingested on or before this date """
     try:
-        answer = answer_question(question)
+        answer = get_rag_engine().query(question, source=source, file_type=file_type, since=since, until=until)
         return {"result": answer}
     except Exception as e:
         return {"error": str(e)}
@@ -370,14 +383,14 @@ def web_automation(url: Optional[str], task: str = "extract all content") -> dic
 def process_management(query: str) -> dict:
     """Interact with system processes. Ask anything about running processes, killing, starting, or getting info. The query should describe what you want to do with processes."""
 
-    result = process_langgraph_agent.invoke({"messages": [("user", query)]})
+    result = process_langgraph_agent.get().invoke({"messages": [("user", query)]})
     return {"result": result["messages"][-1].content}
 
 @tool
 def file_management(query: str) -> dict:
     """Interact with the file system. Ask anything about listing, reading, writing, deleting, moving, or copying files and directories. The query should describe what you want to do with files."""
 
-    result = file_langgraph_agent.invoke({"messages": [("user", query)]})
+    result = file_langgraph_agent.get().invoke({"messages": [("user", query)]})
     return {"result": result["messages"][-1].content}
 
 tools = [open_app, google_search, wikipedia, math_calc, play_music, stop_music, get_current_time, 
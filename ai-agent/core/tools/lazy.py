@@ -0,0 +1,49 @@
+import threading
+import time
+from typing import Any, Callable, Dict
+
+class LazyBackend:
+    """A heavy tool dependency (model weights, a device, a browser, a sub-agent) built on first use.
+
+    Tools are declared with their schemas as usual and call `get()` when they run, so
+    importing the tool modules costs nothing until a tool is actually used. The factory
+    runs once, under a lock; if it raises, the error propagates and the next call retries.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self.name = name
+        self.factory = factory
+        self.init_seconds = None
+        self._value = None
+        self._initialized = False
+        self._lock = threading.Lock()
+
+    @property
+    def initialized(self) -> bool:
+        return self._initialized
+
+    def get(self) -> Any:
+        if not self._initialized:
+            with self._lock:
+                if not self._initialized:
+                    start = time.perf_counter()
+                    self._value = self.factory()
+                    self.init_seconds = time.perf_counter() - start
+                    self._initialized = True
+        return self._value
+
+# Every backend declared by the tool modules, by name
+backends: Dict[str, LazyBackend] = {}
+
+def lazy_backend(name: str) -> Callable[[Callable[[], Any]], LazyBackend]:
+    """Register a factory function as the LazyBackend `name`."""
+    def decorator(factory: Callable[[], Any]) -> LazyBackend:
+        backend = LazyBackend(name, factory)
+        backends[name] = backend
+        return backend
+    return decorator
+
+def backend_status() -> Dict[str, Dict]:
+    """Which backends have been built so far, and how long each took."""
+    return {name: {"initialized": backend.initialized, "init_seconds": backend.init_seconds}
+            for name, backend in backends.items()}
@@ -1,43 +1,46 @@
-import cv2
-from ultralytics import YOLO
 from PIL import Image
-import google.genai as genai
 import os
-
-try:
-    yolo_model = YOLO('yolov8s.pt')
-    YOLO_AVAILABLE = True
-except Exception as e:
-    yolo_model = None
-    YOLO_AVAILABLE = False
-    print(f"Warning: Could not load YOLOv8 model: {e}")
-    print("Object detection functionality will be limited.")
-
-cap = cv2.VideoCapture(0) 
-
-if cap.isOpened():
-    CAMERA_AVAILABLE = True
-
-else:
-    CAMERA_AVAILABLE = False
-    print("Warning: Could not open camera.")
-    print("Visual analysis functionality will be disabled.")
-
-try:
-    gemini_client = genai.Client(api_key=os.getenv('GOOGLE_API_KEY'))
-    GEMINI_VISION_MODEL_NAME = "gemini-2.5-flash-preview-04-17" 
-    GEMINI_AVAILABLE = True
-
-except Exception as e:
-    gemini_client = None
-    GEMINI_AVAILABLE = False
-    print(f"Warning: Gemini API not configured for vision: {e}")
-    print("Gemini vision functionality will be disabled.")
+from .lazy import lazy_backend
+
+GEMINI_VISION_MODEL_NAME = "gemini-2.5-flash-preview-04-17"
+
+# Weights, camera and client are loaded on the first visual query, not at import
+
+@lazy_backend("yolo")
+def yolo_model():
+    try:
+        from ultralytics import YOLO
+        return YOLO('yolov8s.pt')
+    except Exception as e:
+        print(f"Warning: Could not load YOLOv8 model: {e}")
+        print("Object detection functionality will be limited.")
+        return None
+
+@lazy_backend("camera")
+def camera():
+    import cv2
+    cap = cv2.VideoCapture(0)
+    if not cap.isOpened():
+        print("Warning: Could not open camera.")
+        print("Visual analysis functionality will be disabled.")
+    return cap
+
+@lazy_backend("gemini_vision")
+def gemini_client():
+    try:
+        import google.genai as genai
+        return genai.Client(api_key=os.getenv('GOOGLE_API_KEY'))
+    except Exception as e:
+        print(f"Warning: Gemini API not configured for vision: {e}")
+        print("Gemini vision functionality will be disabled.")
+        return None
 
 
 def analyze_visual_input(query: str) -> dict:
+    import cv2
 
-    if not CAMERA_AVAILABLE:
+    cap = camera.get()
+    if not cap.isOpened():
         return {"result": "Visual analysis is unavailable: Camera not accessible."}
 
     ret, frame = cap.read()
@@ -45,11 +48,12 @@ def analyze_visual_input(query: str) -> dict:
     if not ret:
         return {"result": "Visual analysis failed: Could not read frame from camera."}
 
-    if GEMINI_AVAILABLE and query:
+    client = gemini_client.get()
+    if client is not None and query:
         try:
             image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
             contents = [query, image]
-            response = gemini_client.models.generate_content(
+            response = client.models.generate_content(
                 model=GEMINI_VISION_MODEL_NAME,
                 contents=contents
             )
@@ -60,19 +64,20 @@ def analyze_visual_input(query: str) -> dict:
         except Exception as e:
             # If Gemini fails, fall back to YOLO if available
             print(f"Gemini vision analysis failed: {e}. Falling back to YOLO detection if available.")
-            if not YOLO_AVAILABLE:
+            if yolo_model.get() is None:
                  del frame
                  return {"result": f"Visual analysis failed after Gemini error: {str(e)} and YOLO is not available."}
 
-    if YOLO_AVAILABLE:
+    model = yolo_model.get()
+    if model is not None:
          try:
-            results = yolo_model(frame, verbose=False)
+            results = model(frame, verbose=False)
             detected_items = []
             for result in results:
                 for box in result.boxes:
                      confidence = box.conf[0]
                      class_id = box.cls[0]
-                     label = yolo_model.names[int(class_id)]
+                     label = model.names[int(class_id)]
                      # Optionally filter low confidence detections
                      if confidence > 0.5:
                          detected_items.append(label)
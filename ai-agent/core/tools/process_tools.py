@@ -9,6 +9,7 @@ from langchain.tools import tool
 from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
 from langgraph.prebuilt import create_react_agent
+from .lazy import lazy_backend
 
 load_dotenv()
 
@@ -112,11 +113,14 @@ def start_process(command: str, shell: bool = True):
     """Start a new process with the given command."""
     return process_tools_instance.start_process(command, shell)
 
-llm = ChatGoogleGenerativeAI(
-    api_key=os.getenv("GOOGLE_API_KEY"),
-    model="gemini-2.5-flash-preview-04-17",
-    temperature=0.7
-)
-
 process_tools = [list_processes, get_system_info, kill_process, start_process]
-process_langgraph_agent = create_react_agent(llm, process_tools) 
\ No newline at end of file
+
+# Built on the first process_management call
+@lazy_backend("process_agent")
+def process_langgraph_agent():
+    llm = ChatGoogleGenerativeAI(
+        api_key=os.getenv("GOOGLE_API_KEY"),
+        model="gemini-2.5-flash-preview-04-17",
+        temperature=0.7
+    )
+    return create_react_agent(llm, process_tools)
@@ -0,0 +1,256 @@
+import os
+import re
+import json
+import sqlite3
+import hashlib
+import threading
+import time
+import inspect
+import functools
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TOOL_CACHE_ENABLED = os.getenv("TOOL_CACHE_ENABLED", "true").lower() == "true"
+TOOL_CACHE_MAX_ENTRIES = int(os.getenv("TOOL_CACHE_MAX_ENTRIES", 1024))
+# Optional SQLite file, so separate processes (main.py and web/server.py) share results
+TOOL_CACHE_PATH = os.getenv("TOOL_CACHE_PATH")
+
+_WHITESPACE = re.compile(r"\s+")
+
+# How a tool's arguments are normalized into its cache key; part of each tool's cache policy
+ArgsNormalizer = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+def strip_args(args: Dict[str, Any]) -> Dict[str, Any]:
+    """String arguments without surrounding whitespace. Case and inner spacing are kept,
+    since they can change the meaning of a search or a Wolfram query ("mS" vs "ms")."""
+    return {name: value.strip() if isinstance(value, str) else value for name, value in args.items()}
+
+def fold_args(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Case- and whitespace-insensitive string arguments, so "Paris " and "paris" share a key.
+    For arguments such as city names and news topics, where neither carries meaning."""
+    return {name: _WHITESPACE.sub(" ", value).strip().lower() if isinstance(value, str) else value
+            for name, value in args.items()}
+
+def cache_key(tool_name: str, args: Dict[str, Any], normalize: ArgsNormalizer = strip_args) -> str:
+    payload = json.dumps(normalize(args), sort_keys=True, default=str)
+    return f"{tool_name}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+def _jsonable(value: Any) -> Any:
+    # e.g. the Documents returned by the Wikipedia loader
+    if hasattr(value, "page_content"):
+        return {"page_content": value.page_content, "metadata": getattr(value, "metadata", {})}
+    return str(value)
+
+class ToolResultCache:
+    """TTL cache of tool results, keyed by tool name and normalized arguments.
+
+    Results live in an in-memory LRU of at most `max_entries`. With a `path`, they are
+    also written to a SQLite file that other processes read on a memory miss; values
+    are stored there as JSON (objects such as Documents in their dict form). Hits and
+    misses are counted per tool.
+
+    `get_or_call` is single-flight: concurrent calls with the same key (e.g. the
+    parallel tool calls of one model step, or two requests asking the same thing)
+    wait for the first one and share its result, including results that are not
+    cached and exceptions, instead of all missing and running the tool.
+    """
+
+    def __init__(self, max_entries: int = TOOL_CACHE_MAX_ENTRIES, path: Optional[str] = TOOL_CACHE_PATH):
+        self.max_entries = max_entries
+        self.path = path
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._counts: Dict[str, Dict[str, int]] = {}
+        # Calls in progress, by key, that concurrent callers with the same key wait for
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tool_results ("
+                " key TEXT PRIMARY KEY,"
+                " tool TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tool_results_last_used ON tool_results (last_used)")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, tool_name: str, key: str) -> Tuple[bool, Any]:
+        """(True, result) for a fresh cached result, else (False, None)."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is None and self._conn is not None:
+                entry = self._load(key, now)
+                if entry is not None:
+                    self._remember(key, entry)
+
+            counts = self._counts.setdefault(tool_name, {"hits": 0, "misses": 0})
+            if entry is None:
+                counts["misses"] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            counts["hits"] += 1
+            return True, entry[1]
+
+    def get_or_call(self, tool_name: str, key: str, call: Callable[[], Any], ttl: float,
+                    cacheable: Callable[[Any], bool] = lambda result: True) -> Any:
+        """The cached result for `key`, else the result of `call()` (stored if `cacheable`)."""
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                # Answered without running the tool, so it counts as a hit
+                self._counts.setdefault(tool_name, {"hits": 0, "misses": 0})["hits"] += 1
+        if not leader:
+            return future.result()
+
+        try:
+            hit, result = self.get(tool_name, key)
+            if not hit:
+                result = call()
+                if cacheable(result):
+                    self.put(tool_name, key, result, ttl)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        return result
+
+    def put(self, tool_name: str, key: str, value: Any, ttl: float) -> None:
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._remember(key, (expires_at, value))
+            if self._conn is not None:
+                self._store(tool_name, key, value, expires_at)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = sum(counts["hits"] for counts in self._counts.values())
+            misses = sum(counts["misses"] for counts in self._counts.values())
+            return {
+                "entries": len(self._entries),
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                "evictions": self.evictions,
+                "tools": {name: dict(counts) for name, counts in self._counts.items()}
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM tool_results")
+                self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _remember(self, key: str, entry: Tuple[float, Any]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _load(self, key: str, now: float) -> Optional[Tuple[float, Any]]:
+        try:
+            row = self._conn.execute("SELECT value, expires_at FROM tool_results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM tool_results WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE tool_results SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row[1], json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Tool cache read failed: {e}")
+            return None
+
+    def _store(self, tool_name: str, key: str, value: Any, expires_at: float) -> None:
+        try:
+            now = time.time()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tool_results (key, tool, value, expires_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, tool_name, json.dumps(value, default=_jsonable), expires_at, now)
+            )
+            # Drop expired rows, then the least recently used beyond the size bound
+            self._conn.execute("DELETE FROM tool_results WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                "DELETE FROM tool_results WHERE rowid IN (SELECT rowid FROM tool_results "
+                "ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"Tool cache write failed: {e}")
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_tool_cache() -> ToolResultCache:
+    """Process-wide cache shared by the tools of both agents."""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = ToolResultCache()
+    return _default_cache
+
+def is_error_result(result: Any) -> bool:
+    return isinstance(result, dict) and "error" in result
+
+def cached_tool(ttl: float, cacheable: Callable[[Any], bool] = lambda result: not is_error_result(result),
+                normalize: ArgsNormalizer = strip_args):
+    """Cache a tool function's results for `ttl` seconds, keyed by its arguments as
+    `normalize` sees them (trimmed by default; `fold_args` also ignores case and spacing).
+
+    Put it under `@tool`, so the tool keeps the function's name, signature and docstring.
+    Results that `cacheable` rejects (errors by default) are not stored. Concurrent
+    identical calls run the tool once and share its result.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not TOOL_CACHE_ENABLED:
+                return func(*args, **kwargs)
+            cache = get_tool_cache()
+            # Positional and keyword calls, with defaults filled in, map to the same key
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = cache_key(func.__name__, dict(bound.arguments), normalize)
+            return cache.get_or_call(func.__name__, key, lambda: func(*args, **kwargs), ttl, cacheable)
+        return wrapper
+    return decorator
@@ -8,9 +8,11 @@ from langchain_community.utilities import (
     WikipediaAPIWrapper,
 )
 from .image_generation import generate_image
-from .document_reader import answer_question, ingest_documents
+from .tool_cache import cached_tool, fold_args
+from .document_reader import get_rag_engine, ingest_documents
 
 @tool
+@cached_tool(ttl=3600)
 def google_search(query: str) -> dict:
     """Searches Google (via Serper API) for the provided query or topic."""
     try:
@@ -21,6 +23,7 @@ def google_search(query: str) -> dict:
         return {"error": str(e)}
 
 @tool
+@cached_tool(ttl=24 * 3600)
 def wikipedia(query: str) -> Any:
     """Searches Wikipedia for the provided query or topic."""
     try:
@@ -31,6 +34,7 @@ def wikipedia(query: str) -> Any:
         return {"error": str(e)}
     
 @tool
+@cached_tool(ttl=24 * 3600)
 def math_calc(query: str) -> dict:
     """Solve complex math, science, and computational problems. Input should be a precise question."""
     wolfram_client = WolframAlphaAPIWrapper()
@@ -38,6 +42,8 @@ def math_calc(query: str) -> dict:
     return {'result': result}
 
 @tool
+@cached_tool(ttl=900, cacheable=lambda result: isinstance(result, dict) and "result" in result,
+             normalize=fold_args)
 def get_news(
     query: str,
     from_date: Optional[str] = None,
@@ -80,9 +86,8 @@ def get_news(
 @tool
 def recall_context(query: str) -> dict:
     """Recall relevant information from previous conversations when user refers to past discussions."""
-    from core.memory.chat_history import ChatHistory
-    chat_history_manager = ChatHistory()
-    return chat_history_manager.get_relevant_context(query, k=3)
+    from core.memory.service import get_chat_history
+    return get_chat_history().get_relevant_context(query, k=3)
 
 @tool
 def image_recognition(query: str) -> dict:
@@ -111,10 +116,23 @@ def image_generation(prompt: str, name: str, output_format: str = "jpeg", negati
         return {"error": str(e)}
 
 @tool
-def ask_document_question(question: str) -> dict:
-    """Answers a question by searching all ingested documents using RAG and Gemini LLM."""
+def ask_document_question(
+    question: str,
+    source: Optional[str] = None,
+    file_type: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None
+) -> dict:
+    """Answers a question by searching the ingested documents using RAG and Gemini LLM.
+
+    Args:
+        question: The question to answer
+        source: Optional file name (or part of one) to search only that document
+        file_type: Optional file type to search, e.g. "pdf" or "txt"
+        since: Optional YYYY-MM-DD; only documents ingested on or after this date
+        until: Optional YYYY-MM-DD; only documents ingested on or before this date """
     try:
-        answer = answer_question(question)
+        answer = get_rag_engine().query(question, source=source, file_type=file_type, since=since, until=until)
         return {"result": answer}
     except Exception as e:
         return {"error": str(e)}
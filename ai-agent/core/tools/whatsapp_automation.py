@@ -1,4 +1,3 @@
-import pywhatkit as kit
 import pyautogui as pg
 import time
 import os
@@ -9,16 +8,12 @@ from typing import Optional, Literal
 import subprocess
 from langgraph.prebuilt import create_react_agent
 from dotenv import load_dotenv
+from .lazy import lazy_backend
 
 load_dotenv()
 
 now = datetime.now() + timedelta(minutes=1)
 
-llm = ChatGoogleGenerativeAI(
-    api_key=os.getenv("GOOGLE_API_KEY"), 
-    model="gemini-2.0-flash",
-    temperature=0.7
-)
 
 @tool
 def is_whatsapp_desktop_installed() -> dict:
@@ -90,6 +85,8 @@ def whatsapp_automation_web(
     Returns:
         A dictionary with the result or error message.
     """
+    # pywhatkit checks the network and opens browser helpers on import
+    import pywhatkit as kit
         
     try:
         if recipient_type == "individual":
@@ -141,11 +138,19 @@ def whatsapp_automation_web(
 
 
 tools = [is_whatsapp_desktop_installed, whatsapp_automation_app, whatsapp_automation_web]
-whatsapp_langgraph_agent = create_react_agent(llm, tools)
+
+@lazy_backend("whatsapp_agent")
+def whatsapp_langgraph_agent():
+    llm = ChatGoogleGenerativeAI(
+        api_key=os.getenv("GOOGLE_API_KEY"), 
+        model="gemini-2.0-flash",
+        temperature=0.7
+    )
+    return create_react_agent(llm, tools)
 
 def get_message_for_whatsapp(query: str) -> dict:
     messages = [("user", query)]
-    result = whatsapp_langgraph_agent.invoke({"messages": messages})
+    result = whatsapp_langgraph_agent.get().invoke({"messages": messages})
     return {"result": result["messages"][-1].content}
 
     
@@ -1,3 +1,4 @@
+import os
 import threading
 from dotenv import load_dotenv
 
@@ -5,13 +6,14 @@ load_dotenv()
 
 # Get methods
 from core.tools import speech_recognition, speech_synthesis, document_reader
-from core.memory import chat_history
+from core.memory import service as memory_service
 from core.agents.langchain_agent import langgraph_agent
 from core.agents.langchain_agent import tools
 
 # Initialize components
-chat_history_manager = chat_history.ChatHistory(session_only=True)
+chat_history_manager = memory_service.get_chat_history(session_only=True)
 music_playing = False
+DOCUMENTS_FOLDER = "ai-agent/public/documents"
 
 
 def handle_command(query, agent=langgraph_agent):
@@ -43,8 +45,15 @@ def initialize_background_tasks():
     speech_thread = threading.Thread(target=speech_synthesis.process_speech_queue, daemon=True)
     speech_thread.start()
     
-    # Start document ingestion in background
-    ingest_thread = threading.Thread(target=lambda: document_reader.ingest_documents("ai-agent/public/documents"), daemon=True)
+    # Open the document store and build the RAG chain ahead of the first question, then ingest
+    # and keep re-ingesting files as they are added or changed
+    def prepare_documents():
+        document_reader.get_rag_engine().warm_up()
+        document_reader.ingest_documents(DOCUMENTS_FOLDER)
+        if os.getenv("DOCUMENT_WATCH", "true").lower() == "true":
+            document_reader.watch_documents(DOCUMENTS_FOLDER)
+
+    ingest_thread = threading.Thread(target=prepare_documents, daemon=True)
     ingest_thread.start()
 
 if __name__ == '__main__':
@@ -64,4 +73,7 @@ if __name__ == '__main__':
         print("\nShutting down...")
     except Exception as e:
         print(f"\nError: {e}")
+    finally:
+        # Persist any conversation turns still waiting in the write-behind queue
+        memory_service.shutdown()
         
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""Benchmark document Q&A with and without the semantic answer cache.
+
+Asks a stream of questions drawn from a small set, each in a slightly different
+wording, against a temporary document store. Embeddings are offline hash
+embeddings and the chat model is a fake with a fixed generation latency.
+
+Usage: python scripts/bench_answer_cache.py [--asks 200] [--distinct 20] [--generation 0.5]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+workdir = tempfile.mkdtemp(prefix="bench_answer_cache_")
+os.environ["VECTOR_DB_PATH"] = workdir
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+from langchain_core.language_models import FakeListChatModel
+import core.tools.document_reader as document_reader
+from scripts.corpus import WORDS, generate_corpus
+from scripts.fakes import HashEmbeddings
+
+
+def reword(question: str, rng: random.Random) -> str:
+    variants = [question, question.lower(), question.upper(), f"{question} please", f"  {question}  ",
+                question.replace(" the ", " the  ")]
+    return rng.choice(variants)
+
+
+def run(label: str, engine, asks) -> None:
+    timings = []
+    start = time.perf_counter()
+    for question in asks:
+        ask_start = time.perf_counter()
+        engine.query(question)
+        timings.append(time.perf_counter() - ask_start)
+    elapsed = time.perf_counter() - start
+
+    timings.sort()
+    p50 = statistics.median(timings) * 1000
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000
+    stats = engine.cache_stats()
+    hit_rate = f"hit rate {stats['hit_rate']:.0%}" if stats else ""
+    print(f"{label:<10} {elapsed:7.2f}s  p50 {p50:8.2f} ms  p99 {p99:8.2f} ms  {hit_rate}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--asks", type=int, default=200)
+    parser.add_argument("--distinct", type=int, default=20)
+    parser.add_argument("--generation", type=float, default=0.5, help="simulated seconds per answer generation")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    document_reader.embeddings = HashEmbeddings()
+    folder = os.path.join(workdir, "docs")
+    generate_corpus(folder, files=30, pages=3)
+    document_reader.ingest_documents(folder, progress=None)
+
+    questions = [f"What did the {rng.choice(WORDS)} {rng.choice(WORDS)} report say about the {rng.choice(WORDS)}"
+                 for _ in range(args.distinct)]
+    asks = [reword(rng.choice(questions), rng) for _ in range(args.asks)]
+
+    chat_model = FakeListChatModel(responses=["answer"], sleep=args.generation)
+    run("no cache", document_reader.RAGEngine(chat_model=chat_model, use_cache=False), asks)
+    run("cache", document_reader.RAGEngine(chat_model=chat_model, use_cache=True), asks)
+
+
+if __name__ == "__main__":
+    main()
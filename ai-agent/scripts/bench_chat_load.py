@@ -0,0 +1,115 @@
+"""Load test for /api/chat with a fake agent: throughput as concurrent clients grow.
+
+Serves web/server.py in-process (httpx ASGITransport) with a ReAct agent built on a
+scripted chat model with a fixed latency and one synchronous tool, so every turn is
+model call -> tool -> model call and no network is involved. Two ways of running
+the agent are compared:
+- async: the endpoint as it is (ainvoke, sync tools on the bounded thread pool)
+- blocking: the agent invoked synchronously inside the handler (the old behaviour),
+  which blocks the event loop for the whole turn
+
+Throughput is the number to compare. The blocking p50 looks flat because clients
+share the blocked loop, so a request's clock only starts once the loop is free.
+
+Usage: python scripts/bench_chat_load.py [--clients 1 2 4 8 16] [--requests 4]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import types
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+parser.add_argument("--requests", type=int, default=4, help="requests per client")
+parser.add_argument("--model-latency", type=float, default=0.05, help="seconds per model call")
+parser.add_argument("--tool-latency", type=float, default=0.05, help="seconds per (synchronous) tool call")
+parser.add_argument("--max-concurrency", type=int, default=8, help="CHAT_MAX_CONCURRENCY")
+parser.add_argument("--tool-threads", type=int, default=16, help="CHAT_TOOL_THREADS")
+args = parser.parse_args()
+
+os.environ["VECTOR_DB_PATH"] = tempfile.mkdtemp(prefix="bench_chat_load_")
+os.environ["DOCUMENT_WATCH"] = "false"
+os.environ["CHAT_MAX_CONCURRENCY"] = str(args.max_concurrency)
+os.environ["CHAT_TOOL_THREADS"] = str(args.tool_threads)
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+import httpx
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+from langgraph.prebuilt import create_react_agent
+from scripts.fakes import ScriptedChatModel
+
+
+@tool
+def lookup(query: str) -> str:
+    """Look something up (a blocking call, like most of the real tools)."""
+    time.sleep(args.tool_latency)
+    return f"result for {query}"
+
+
+model = ScriptedChatModel(latency=args.model_latency, responses=[
+    AIMessage("", tool_calls=[{"name": "lookup", "args": {"query": "load test"}, "id": "call-1"}]),
+    AIMessage("Here is what I found.")
+])
+fake_agent = create_react_agent(model, [lookup])
+
+# Stand in for the Gemini agents so importing the server loads no real tools or clients
+sys.modules["core.agents.langchain_agent"] = types.SimpleNamespace(
+    langgraph_agent=fake_agent, langgraph_web_agent=fake_agent)
+import web.server as server
+
+
+class BlockingAgent:
+    """The previous endpoint behaviour: a synchronous invoke on the event loop."""
+
+    def __init__(self, agent):
+        self.agent = agent
+
+    async def ainvoke(self, input, config=None):
+        return self.agent.invoke(input, config)
+
+
+async def run_level(client: httpx.AsyncClient, clients: int) -> dict:
+    latencies = []
+
+    async def user(index: int):
+        for i in range(args.requests):
+            start = time.perf_counter()
+            response = await client.post("/api/chat", json={"message": f"question {i}", "session_id": f"load-{index}"})
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(index) for index in range(clients)))
+    elapsed = time.perf_counter() - start
+    return {"throughput": len(latencies) / elapsed, "p50": statistics.median(latencies)}
+
+
+async def main():
+    # ASGITransport does not run startup hooks; install the bounded tool pool by hand
+    await server.bound_tool_threads()
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        results = {}
+        for mode, agent in (("blocking", BlockingAgent(fake_agent)), ("async", fake_agent)):
+            server.langgraph_web_agent = agent
+            results[mode] = [await run_level(client, clients) for clients in args.clients]
+
+    turn = 2 * args.model_latency + args.tool_latency
+    print(f"fake turn: 2 model calls x {args.model_latency * 1000:.0f} ms + tool {args.tool_latency * 1000:.0f} ms "
+          f"= {turn * 1000:.0f} ms; concurrency limit {args.max_concurrency}, tool threads {args.tool_threads}")
+    print(f"{'clients':>8} {'blocking req/s':>15} {'p50 ms':>8} {'async req/s':>12} {'p50 ms':>8} {'speedup':>8}")
+    for clients, blocking, concurrent in zip(args.clients, results["blocking"], results["async"]):
+        print(f"{clients:>8} {blocking['throughput']:>15.1f} {blocking['p50'] * 1000:>8.0f} "
+              f"{concurrent['throughput']:>12.1f} {concurrent['p50'] * 1000:>8.0f} "
+              f"{concurrent['throughput'] / blocking['throughput']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""Benchmark near-duplicate chunk elimination on a corpus of revised reports.
+
+Ingests several versions of each report with and without MinHash/LSH
+deduplication (offline hash embeddings) and reports the stored chunk count,
+embedding calls, ingestion time and how many distinct passages fill the top-k.
+
+Usage: python scripts/bench_dedup.py [--reports 20] [--versions 4] [--k 4]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+workdir = tempfile.mkdtemp(prefix="bench_dedup_")
+os.environ["VECTOR_DB_PATH"] = workdir
+os.environ["ANSWER_CACHE_ENABLED"] = "false"
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+import core.tools.document_reader as document_reader
+from core.retrieval.dedup import MinHasher
+from scripts.corpus import generate_versioned_corpus
+from scripts.fakes import HashEmbeddings
+
+
+def distinct_passages(docs) -> int:
+    hasher = MinHasher()
+    signatures = []
+    for doc in docs:
+        signature = hasher.signature(doc.page_content)
+        if all(MinHasher.similarity(signature, other) < 0.8 for other in signatures):
+            signatures.append(signature)
+    return len(signatures)
+
+
+def run(label: str, dedup: bool, folder: str, queries, k: int) -> None:
+    store = os.path.join(workdir, label.replace(" ", "_"))
+    document_reader.INGEST_DEDUP = dedup
+    document_reader.CHROMA_RAG_DB_PATH = store
+    document_reader.MANIFEST_PATH = os.path.join(store, "ingest_manifest.json")
+    document_reader.DEDUP_INDEX_PATH = os.path.join(store, "dedup_index.json")
+    embeddings = HashEmbeddings(dimensions=1024)
+    document_reader.embeddings = embeddings
+
+    start = time.perf_counter()
+    document_reader.ingest_documents(folder, progress=None)
+    elapsed = time.perf_counter() - start
+
+    engine = document_reader.RAGEngine(persist_directory=store, use_cache=False)
+    engine.warm_up()
+    stored = engine._vectordb._collection.count()
+    distinct = sum(distinct_passages(engine.retrieve(query, k=k)) for query in queries) / len(queries)
+    print(f"{label:<12} {stored:6d} chunks stored  {embeddings.embedded:6d} embedded  {elapsed:6.2f}s  "
+          f"{distinct:4.2f}/{k} distinct passages in top-{k}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reports", type=int, default=20)
+    parser.add_argument("--versions", type=int, default=4)
+    parser.add_argument("--k", type=int, default=4)
+    args = parser.parse_args()
+
+    folder = os.path.join(workdir, "docs")
+    paths = generate_versioned_corpus(folder, reports=args.reports, versions=args.versions)
+    # Queries are opening sentences of the first version of each report
+    queries = []
+    for path in paths[::args.versions]:
+        with open(path, encoding="utf-8") as f:
+            queries.append(f.read().split(".")[0])
+
+    print(f"{args.reports} reports x {args.versions} versions")
+    run("no dedup", False, folder, queries, args.k)
+    run("dedup", True, folder, queries, args.k)
+
+
+if __name__ == "__main__":
+    main()
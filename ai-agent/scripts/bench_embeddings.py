@@ -0,0 +1,43 @@
+"""Benchmark serial vs batched/concurrent GeminiEmbeddingFunction calls offline.
+
+Usage: python scripts/bench_embeddings.py [--texts 500] [--latency 0.08]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.memory.vector_memory import GeminiEmbeddingFunction
+from scripts.fakes import FakeEmbeddingClient
+
+
+def run(label: str, texts, batch_size: int, max_workers: int, latency: float) -> list:
+    client = FakeEmbeddingClient(latency=latency)
+    embed = GeminiEmbeddingFunction(client=client, batch_size=batch_size, max_workers=max_workers,
+                                     use_cache=False)
+    start = time.perf_counter()
+    embeddings = embed(texts)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.2f}s  {client.models.requests:5d} requests  {len(texts) / elapsed:8.1f} texts/s")
+    return embeddings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.08, help="simulated round-trip seconds per request")
+    args = parser.parse_args()
+
+    texts = [f"User: question number {i}\nAI: answer number {i}" for i in range(args.texts)]
+
+    serial = run("serial (batch=1, workers=1)", texts, 1, 1, args.latency)
+    batched = run("batched (batch=32, workers=1)", texts, 32, 1, args.latency)
+    concurrent = run("batched (batch=32, workers=4)", texts, 32, 4, args.latency)
+
+    assert serial == batched == concurrent, "embeddings must be identical and in input order"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Benchmark parallel document parsing and splitting over a generated corpus.
+
+Measures load_and_split_files (the parse + split stage of ingest_documents, no
+embedding) with increasing worker counts and reports the speedup over serial.
+
+Usage: python scripts/bench_ingest_parallel.py [--files 300] [--pages 5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.retrieval.document_loading import load_and_split_files
+from scripts.corpus import generate_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=300)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--workers", type=int, nargs="*", help="worker counts to try (default 1, 2, 4, ... cpu count)")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    worker_counts = args.workers or sorted({1, *[2 ** i for i in range(1, 8) if 2 ** i <= cpus], cpus})
+
+    with tempfile.TemporaryDirectory() as folder:
+        paths = sorted(generate_corpus(folder, files=args.files, pages=args.pages))
+        print(f"{len(paths)} files, {args.pages} pages each, {cpus} CPUs")
+
+        baseline = None
+        reference = None
+        for workers in worker_counts:
+            start = time.perf_counter()
+            results = list(load_and_split_files(paths, 1000, 200, workers))
+            elapsed = time.perf_counter() - start
+
+            chunk_ids = [ids for _, _, ids, _ in results]
+            errors = sum(1 for *_, error in results if error)
+            reference = reference or chunk_ids
+            assert chunk_ids == reference, "results must be identical and in input order"
+
+            baseline = baseline or elapsed
+            chunks = sum(len(ids) for ids in chunk_ids)
+            print(f"workers={workers:<3} {elapsed:7.2f}s  {chunks / elapsed:9.1f} chunks/s  "
+                  f"speedup x{baseline / elapsed:4.2f}  errors={errors}")
+
+
+if __name__ == "__main__":
+    main()
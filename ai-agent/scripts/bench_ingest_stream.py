@@ -0,0 +1,77 @@
+"""Benchmark streaming ingestion against the old load-everything-then-add approach.
+
+Ingests generated corpora of growing size into a temporary Chroma store with
+offline hash embeddings and reports peak traced Python memory, total time and
+the time until the first chunks are queryable. The streaming pipeline's peak
+should stay roughly flat as the corpus grows.
+
+Usage: python scripts/bench_ingest_stream.py [--sizes 50 200] [--latency 0.02]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+from langchain_chroma import Chroma
+from core.retrieval.document_loading import load_and_split_files
+from core.retrieval.ingest_manifest import IngestManifest
+from core.retrieval.ingest_pipeline import IngestPipeline
+from scripts.corpus import generate_corpus
+from scripts.fakes import HashEmbeddings
+
+
+def buffered(paths, store, embeddings):
+    """The previous ingest_documents: every chunk in one list, one add_documents call."""
+    chunks, ids = [], []
+    for _, file_chunks, file_ids, error in load_and_split_files(paths, 1000, 200):
+        if not error:
+            chunks.extend(file_chunks)
+            ids.extend(file_ids)
+    Chroma(collection_name="bench", embedding_function=embeddings, persist_directory=store).add_documents(chunks, ids=ids)
+
+
+def streaming(paths, store, embeddings, first_landed):
+    vectordb = Chroma(collection_name="bench", embedding_function=embeddings, persist_directory=store)
+    pipeline = IngestPipeline(vectordb._collection, embeddings, IngestManifest(os.path.join(store, "manifest.json")),
+                              progress=lambda done, total, chunks: first_landed.append(time.perf_counter()))
+    pipeline.run(load_and_split_files(paths, 1000, 200), len(paths))
+
+
+def measure(label, func, *args):
+    first_landed = []
+    tracemalloc.start()
+    start = time.perf_counter()
+    if label == "streaming":
+        func(*args, first_landed)
+    else:
+        func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    first = first_landed[0] - start if first_landed else elapsed
+    print(f"  {label:<10} {elapsed:7.2f}s  peak {peak / 2 ** 20:7.1f} MiB  first chunks queryable after {first:6.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="*", default=[50, 200], help="corpus sizes in files")
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated seconds per embedding request")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            paths = sorted(generate_corpus(os.path.join(folder, "docs"), files=size, pages=args.pages))
+            print(f"{size} files:")
+            measure("buffered", buffered, paths, os.path.join(folder, "buffered"), HashEmbeddings(latency=args.latency))
+            measure("streaming", streaming, paths, os.path.join(folder, "streaming"), HashEmbeddings(latency=args.latency))
+
+
+if __name__ == "__main__":
+    main()
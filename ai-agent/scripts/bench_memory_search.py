@@ -0,0 +1,77 @@
+"""Compare conversation-memory search latency: Chroma (count() + HNSW query) vs the NumPy index.
+
+Embedding time is excluded; both paths get the same precomputed query vectors.
+
+Usage: python scripts/bench_memory_search.py [--size 3000] [--queries 500] [--dtype float32]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import chromadb
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.memory.numpy_index import NumpyIndex
+
+
+def percentiles(samples):
+    samples = np.array(samples) * 1000
+    return np.percentile(samples, 50), np.percentile(samples, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=3000)
+    parser.add_argument("--dimensions", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float16"])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.size, args.dimensions)).astype(np.float32)
+    queries = rng.standard_normal((args.queries, args.dimensions)).astype(np.float32)
+    ids = [f"{i:08d}" for i in range(args.size)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        client = chromadb.PersistentClient(path=directory)
+        collection = client.get_or_create_collection(name="bench", metadata={"hnsw:space": "cosine"})
+        for start in range(0, args.size, 1000):
+            collection.add(ids=ids[start:start + 1000], embeddings=vectors[start:start + 1000].tolist())
+
+        chroma_samples = []
+        for query in queries:
+            start = time.perf_counter()
+            collection.query(
+                query_embeddings=[query.tolist()],
+                n_results=min(args.k, collection.count()),
+                include=["metadatas", "distances"]
+            )
+            chroma_samples.append(time.perf_counter() - start)
+
+        index = NumpyIndex(args.dimensions, dtype=args.dtype)
+        index.add(ids, vectors)
+        index.save(os.path.join(directory, "bench_index"))
+        mapped = NumpyIndex.load(os.path.join(directory, "bench_index"))
+
+        results = {"chroma (count + query)": chroma_samples}
+        for label, idx in ((f"numpy {args.dtype}", index), (f"numpy {args.dtype} mmap", mapped)):
+            samples = []
+            for query in queries:
+                start = time.perf_counter()
+                idx.search(query, args.k)
+                samples.append(time.perf_counter() - start)
+            results[label] = samples
+
+    print(f"{args.size} vectors x {args.dimensions} dims, {args.queries} queries, k={args.k}")
+    for label, samples in results.items():
+        p50, p99 = percentiles(samples)
+        print(f"{label:<26} p50 {p50:8.3f} ms   p99 {p99:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
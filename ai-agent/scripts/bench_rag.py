@@ -0,0 +1,148 @@
+"""Offline retrieval quality and latency benchmark for document RAG.
+
+Generates a corpus with planted facts and labeled questions, ingests it with
+ingest_documents using deterministic hash embeddings, then reports:
+- ingestion throughput (chunks/s)
+- recall@k and MRR of RAGEngine.retrieve against the labels
+- prompt context tokens, packed (pack_context) vs the raw Document list, and how
+  often the labeled fact survives packing
+- recall@k and latency of retrieval filtered to the labeled file (source=...)
+- p50/p99 latency of answer_question (fake chat model, answer cache off)
+
+Use it to compare chunking and k settings; --min-recall / --min-mrr turn it into
+a gate that exits non-zero on a regression, and --json writes the numbers out.
+
+Usage: python scripts/bench_rag.py [--chunk-size 1000] [--chunk-overlap 200] [--k 4]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+workdir = tempfile.mkdtemp(prefix="bench_rag_")
+os.environ["VECTOR_DB_PATH"] = workdir
+os.environ["ANSWER_CACHE_ENABLED"] = "false"
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+from langchain_core.language_models import FakeListChatModel
+import core.tools.document_reader as document_reader
+from core.retrieval.context_packing import pack_context
+from core.utils.tokens import estimate_tokens
+from scripts.corpus import generate_labeled_corpus
+from scripts.fakes import HashEmbeddings
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--facts", type=int, default=3, help="planted facts (labeled questions) per file")
+    parser.add_argument("--chunk-size", type=int, default=document_reader.CHUNK_SIZE)
+    parser.add_argument("--chunk-overlap", type=int, default=document_reader.CHUNK_OVERLAP)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--dimensions", type=int, default=1024, help="hash embedding dimensions")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-recall", type=float, default=None, help="exit 1 if recall@k is below this")
+    parser.add_argument("--min-mrr", type=float, default=None, help="exit 1 if MRR is below this")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    document_reader.CHUNK_SIZE = args.chunk_size
+    document_reader.CHUNK_OVERLAP = args.chunk_overlap
+    document_reader.embeddings = HashEmbeddings(dimensions=args.dimensions)
+    document_reader.llm = FakeListChatModel(responses=["answer"])
+
+    folder = os.path.join(workdir, "docs")
+    labels = generate_labeled_corpus(folder, files=args.files, facts_per_file=args.facts, seed=args.seed)
+
+    start = time.perf_counter()
+    document_reader.ingest_documents(folder, progress=None)
+    ingest_seconds = time.perf_counter() - start
+
+    engine = document_reader.get_rag_engine()
+    engine.warm_up()
+    chunks = engine._vectordb._collection.count()
+
+    hits = 0
+    packed_hits = 0
+    reciprocal_ranks = []
+    raw_tokens, packed_tokens = [], []
+    for question, source, marker in labels:
+        docs = engine.retrieve(question, k=args.k)
+        rank = next((i for i, doc in enumerate(docs, start=1)
+                     if doc.metadata.get("source") == source and marker in doc.page_content), None)
+        hits += rank is not None
+        reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+
+        context = pack_context(docs, document_reader.RAG_CONTEXT_TOKENS)
+        packed_hits += rank is not None and " ".join(marker.split()) in " ".join(context.split())
+        raw_tokens.append(estimate_tokens(str(docs)))
+        packed_tokens.append(estimate_tokens(context))
+
+    filtered_hits = 0
+    filtered_timings = []
+    for question, source, marker in labels:
+        start = time.perf_counter()
+        docs = engine.retrieve(question, k=args.k, source=os.path.basename(source))
+        filtered_timings.append(time.perf_counter() - start)
+        filtered_hits += any(doc.metadata.get("source") == source and marker in doc.page_content for doc in docs)
+
+    timings = []
+    for question, _, _ in labels:
+        start = time.perf_counter()
+        document_reader.answer_question(question, k=args.k)
+        timings.append(time.perf_counter() - start)
+
+    results = {
+        "chunk_size": args.chunk_size,
+        "chunk_overlap": args.chunk_overlap,
+        "k": args.k,
+        "questions": len(labels),
+        "chunks": chunks,
+        "ingest_chunks_per_second": chunks / ingest_seconds,
+        "recall_at_k": hits / len(labels),
+        "mrr": statistics.mean(reciprocal_ranks),
+        "context_tokens_raw": statistics.mean(raw_tokens),
+        "context_tokens_packed": statistics.mean(packed_tokens),
+        "fact_kept_after_packing": packed_hits / hits if hits else 0.0,
+        "recall_at_k_source_filtered": filtered_hits / len(labels),
+        "filtered_retrieve_p50_ms": statistics.median(filtered_timings) * 1000,
+        "query_p50_ms": statistics.median(timings) * 1000,
+        "query_p99_ms": percentile(timings, 0.99) * 1000
+    }
+
+    print(f"corpus      {args.files} files, {chunks} chunks (size {args.chunk_size}, overlap {args.chunk_overlap})")
+    print(f"ingestion   {results['ingest_chunks_per_second']:.1f} chunks/s")
+    print(f"recall@{args.k:<4}{results['recall_at_k']:.3f}")
+    print(f"MRR         {results['mrr']:.3f}")
+    print(f"context     {results['context_tokens_raw']:.0f} -> {results['context_tokens_packed']:.0f} tokens "
+          f"(packed), retrieved fact kept in {results['fact_kept_after_packing']:.1%}")
+    print(f"filtered    recall@{args.k} {results['recall_at_k_source_filtered']:.3f} with source=<file>, "
+          f"retrieve p50 {results['filtered_retrieve_p50_ms']:.2f} ms")
+    print(f"query       p50 {results['query_p50_ms']:.2f} ms  p99 {results['query_p99_ms']:.2f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    failed = []
+    if args.min_recall is not None and results["recall_at_k"] < args.min_recall:
+        failed.append(f"recall@{args.k} {results['recall_at_k']:.3f} < {args.min_recall}")
+    if args.min_mrr is not None and results["mrr"] < args.min_mrr:
+        failed.append(f"MRR {results['mrr']:.3f} < {args.min_mrr}")
+    if failed:
+        print("FAILED: " + "; ".join(failed))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
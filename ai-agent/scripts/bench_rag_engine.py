@@ -0,0 +1,86 @@
+"""Benchmark per-question RAG setup against the long-lived RAGEngine.
+
+Builds a temporary document store with offline hash embeddings and answers the
+same questions two ways, with a fake chat model so only retrieval and setup
+cost are measured:
+- per call: open Chroma and build the retriever, prompt and chain every time
+  (what answer_question used to do)
+- engine: a warmed-up RAGEngine reused across questions
+
+Usage: python scripts/bench_rag_engine.py [--questions 50] [--files 40]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+workdir = tempfile.mkdtemp(prefix="bench_rag_engine_")
+os.environ["VECTOR_DB_PATH"] = workdir
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+from langchain_chroma import Chroma
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import RunnableMap
+import core.tools.document_reader as document_reader
+from scripts.corpus import generate_corpus
+from scripts.fakes import HashEmbeddings
+
+
+def per_call(question: str, chat_model) -> str:
+    vectordb = Chroma(collection_name=document_reader.COLLECTION_NAME,
+                      embedding_function=document_reader.embeddings,
+                      persist_directory=document_reader.CHROMA_RAG_DB_PATH)
+    retriever = vectordb.as_retriever(search_kwargs={"k": 4})
+    chain = RunnableMap({"context": retriever, "question": lambda x: x}) | document_reader.RAG_PROMPT | chat_model | StrOutputParser()
+    return chain.invoke(question)
+
+
+def report(label: str, timings) -> None:
+    timings = sorted(timings)
+    p50 = statistics.median(timings) * 1000
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000
+    print(f"{label:<10} p50 {p50:7.2f} ms  p99 {p99:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--files", type=int, default=40)
+    args = parser.parse_args()
+
+    document_reader.embeddings = HashEmbeddings()
+    chat_model = FakeListChatModel(responses=["ok"])
+
+    folder = os.path.join(workdir, "docs")
+    generate_corpus(folder, files=args.files, pages=3)
+    document_reader.ingest_documents(folder, progress=None)
+
+    questions = [f"what was the {word} incident in region {i}" for i, word in
+                 zip(range(args.questions), ["latency", "budget", "audit", "sensor", "release"] * args.questions)]
+
+    timings = []
+    for question in questions:
+        start = time.perf_counter()
+        per_call(question, chat_model)
+        timings.append(time.perf_counter() - start)
+    report("per call", timings)
+
+    engine = document_reader.RAGEngine(chat_model=chat_model, use_cache=False)
+    start = time.perf_counter()
+    engine.warm_up()
+    print(f"warm-up    {(time.perf_counter() - start) * 1000:7.2f} ms (paid once)")
+    timings = []
+    for question in questions:
+        start = time.perf_counter()
+        engine.query(question)
+        timings.append(time.perf_counter() - start)
+    report("engine", timings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Cold-start benchmark for the tool modules and agents.
+
+Imports each module in a fresh interpreter and reports the median import time,
+the threads left running (e.g. a watchdog Observer) and which lazy backends
+(core/tools/lazy.py) were already built. With --baseline REV the same
+measurement runs against a git worktree of an older revision, for a before/after
+comparison; --init also times building every lazy backend on first use (this
+opens the camera and a browser, so it is off by default).
+
+Usage: python scripts/bench_startup.py [--runs 3] [--baseline HEAD~1] [--init]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+MODULES = [
+    "core.tools.object_detection",
+    "core.tools.image_recognition",
+    "core.tools.ai_scraper",
+    "core.tools.file_system_tools",
+    "core.tools.process_tools",
+    "core.tools.whatsapp_automation",
+    "core.tools.web_tools",
+    "core.tools.langchain_tools",
+    "core.agents.langchain_agent",
+]
+
+# Runs in the child interpreter: import one module and describe what it left behind
+PROBE = r"""
+import importlib, json, sys, threading, time
+sys.path.insert(0, sys.argv[1])
+result = {}
+start = time.perf_counter()
+try:
+    importlib.import_module(sys.argv[2])
+    result["seconds"] = time.perf_counter() - start
+except BaseException as e:
+    result["error"] = f"{type(e).__name__}: {e}"
+result["threads"] = threading.active_count()
+try:
+    from core.tools.lazy import backends
+    result["built"] = sorted(name for name, backend in backends.items() if backend.initialized)
+    if sys.argv[3] == "init" and "error" not in result:
+        result["init"] = {}
+        for name, backend in backends.items():
+            try:
+                backend.get()
+                result["init"][name] = backend.init_seconds
+            except Exception as e:
+                result["init"][name] = f"{type(e).__name__}: {e}"
+except ImportError:
+    result["built"] = None
+print("\n" + json.dumps(result))
+"""
+
+
+def probe(root: str, module: str, init: bool) -> dict:
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    completed = subprocess.run([sys.executable, "-c", PROBE, root, module, "init" if init else "import"],
+                               cwd=root, env=env, capture_output=True, text=True, timeout=600)
+    lines = [line for line in completed.stdout.splitlines() if line.startswith("{")]
+    if not lines:
+        return {"error": (completed.stderr.strip().splitlines() or ["no output"])[-1]}
+    return json.loads(lines[-1])
+
+
+def measure(root: str, runs: int, init: bool) -> dict:
+    results = {}
+    for module in MODULES:
+        samples = [probe(root, module, init and run == 0) for run in range(runs)]
+        ok = [sample for sample in samples if "error" not in sample]
+        if not ok:
+            results[module] = {"error": samples[0]["error"]}
+            continue
+        results[module] = {
+            "seconds": statistics.median(sample["seconds"] for sample in ok),
+            "threads": ok[0]["threads"],
+            "built": ok[0]["built"],
+            "init": samples[0].get("init")
+        }
+    return results
+
+
+def baseline_tree(revision: str) -> tuple:
+    """A temporary worktree at `revision`; returns (worktree, package root inside it)."""
+    prefix = subprocess.run(["git", "rev-parse", "--show-prefix"], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout.strip()
+    worktree = tempfile.mkdtemp(prefix="bench_startup_")
+    subprocess.run(["git", "worktree", "add", "--detach", worktree, revision], cwd=ROOT,
+                   capture_output=True, text=True, check=True)
+    return worktree, os.path.join(worktree, prefix)
+
+
+def describe(result: dict) -> str:
+    if "error" in result:
+        return f"unavailable ({result['error'][:60]})"
+    built = result["built"]
+    built = "n/a" if built is None else (", ".join(built) or "none")
+    return f"{result['seconds']:7.2f} s  threads {result['threads']:<3} built: {built}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per module (median)")
+    parser.add_argument("--baseline", help="git revision to compare against, e.g. HEAD~1")
+    parser.add_argument("--init", action="store_true", help="also time building every lazy backend")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    results = {"current": measure(ROOT, args.runs, args.init)}
+    if args.baseline:
+        worktree, root = baseline_tree(args.baseline)
+        try:
+            results["baseline"] = measure(root, args.runs, False)
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", worktree], cwd=ROOT, capture_output=True)
+            shutil.rmtree(worktree, ignore_errors=True)
+
+    for module in MODULES:
+        print(module)
+        if args.baseline:
+            print(f"  {args.baseline:<10} {describe(results['baseline'][module])}")
+        print(f"  {'current':<10} {describe(results['current'][module])}")
+        before = results.get("baseline", {}).get(module, {}).get("seconds")
+        after = results["current"][module].get("seconds")
+        if before and after:
+            print(f"  {'':<10} {before - after:.2f} s saved ({before / after:.1f}x faster)")
+        for name, seconds in (results["current"][module].get("init") or {}).items():
+            cost = f"{seconds:.2f} s" if isinstance(seconds, float) else seconds
+            print(f"  first use  {name}: {cost}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
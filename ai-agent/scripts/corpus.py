@@ -0,0 +1,127 @@
+"""Synthetic document corpora for the ingestion and RAG benchmarks."""
+import os
+import random
+from typing import List, Tuple
+
+WORDS = (
+    "system network storage latency cluster broker partition replica schema index query cache "
+    "budget revenue forecast quarter margin customer contract invoice region supplier audit "
+    "policy compliance incident outage deploy release rollback metric dashboard alert threshold "
+    "engine turbine sensor voltage pressure calibration batch sample protocol trial result"
+).split()
+
+
+FACT_ATTRIBUTES = ["maximum operating temperature", "calibration code", "annual maintenance cost",
+                   "rated throughput", "warranty period in days", "serial batch number"]
+
+
+def paragraph(rng: random.Random, sentences: int = 6) -> str:
+    return " ".join(
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 16))).capitalize() + "."
+        for _ in range(sentences)
+    )
+
+
+def write_pdf(path: str, pages: List[str]) -> None:
+    """Write a minimal, valid text PDF (Helvetica, one text object per page)."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for text in pages:
+        lines, line = [], ""
+        for word in text.split():
+            if len(line) + len(word) > 90:
+                lines.append(line)
+                line = ""
+            line = f"{line} {word}".strip()
+        lines.append(line)
+        escaped = [l.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for l in lines]
+        stream = "BT /F1 10 Tf 12 TL 40 800 Td " + " ".join(f"({l}) '" for l in escaped) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>")
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def generate_corpus(folder: str, files: int = 200, pages: int = 5, seed: int = 0, pdf_ratio: float = 0.8) -> List[str]:
+    """Generate a folder of PDF and TXT files filled with random domain text."""
+    rng = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    for i in range(files):
+        texts = [" ".join(paragraph(rng) for _ in range(4)) for _ in range(pages)]
+        if rng.random() < pdf_ratio:
+            path = os.path.join(folder, f"report_{i:04d}.pdf")
+            write_pdf(path, texts)
+        else:
+            path = os.path.join(folder, f"notes_{i:04d}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n\n".join(texts))
+        paths.append(path)
+    return paths
+
+
+def generate_labeled_corpus(folder: str, files: int = 100, facts_per_file: int = 3, pages: int = 3,
+                            seed: int = 0) -> List[Tuple[str, str, str]]:
+    """Generate TXT files with planted facts; returns (question, source path, answer marker) labels.
+
+    Every fact mentions a unique unit code that only its question shares, so a
+    retrieved chunk is relevant exactly when it contains the fact's marker.
+    """
+    rng = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    labels = []
+    for i in range(files):
+        path = os.path.abspath(os.path.join(folder, f"labeled_{i:04d}.txt"))
+        paragraphs = [paragraph(rng) for _ in range(pages * 4)]
+        for j in range(facts_per_file):
+            unit = f"unit-{i:04d}-{j}"
+            attribute = rng.choice(FACT_ATTRIBUTES)
+            value = rng.randint(100, 9999)
+            marker = f"{attribute} of {unit} is {value}"
+            position = rng.randrange(len(paragraphs))
+            paragraphs[position] = f"{paragraphs[position]} The {marker}. {paragraph(rng, 2)}"
+            labels.append((f"What is the {attribute} of {unit}?", path, marker))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n\n".join(paragraphs))
+    return labels
+
+
+def generate_versioned_corpus(folder: str, reports: int = 20, versions: int = 4, paragraphs: int = 12,
+                              revise: float = 0.15, seed: int = 0) -> List[str]:
+    """Generate several revisions of each report: every version rewrites a fraction of the
+    previous one's paragraphs and lightly edits (punctuation, one word) a few others."""
+    rng = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    for i in range(reports):
+        text = [paragraph(rng) for _ in range(paragraphs)]
+        for version in range(1, versions + 1):
+            if version > 1:
+                for j in range(paragraphs):
+                    roll = rng.random()
+                    if roll < revise:
+                        text[j] = paragraph(rng)
+                    elif roll < revise * 2:
+                        words = text[j].split()
+                        words[rng.randrange(len(words))] = rng.choice(WORDS)
+                        text[j] = " ".join(words)
+            path = os.path.join(folder, f"report_{i:03d}_v{version}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n\n".join(text))
+            paths.append(path)
+    return paths
@@ -0,0 +1,123 @@
+"""Offline stand-ins for the Gemini clients, used by the benchmark scripts."""
+import asyncio
+import hashlib
+import json
+import math
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import List, Union
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+def hash_embedding(text: str, dimensions: int = 64) -> List[float]:
+    """Deterministic unit-length embedding built from hashed word features."""
+    vector = [0.0] * dimensions
+    for word in re.findall(r"[\w-]+", text.lower()):
+        digest = hashlib.md5(word.encode("utf-8")).digest()
+        index = int.from_bytes(digest[:4], "little") % dimensions
+        vector[index] += 1.0 if digest[4] % 2 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+class FakeEmbeddingModels:
+    def __init__(self, latency: float, per_item_latency: float, dimensions: int):
+        self.latency = latency
+        self.per_item_latency = per_item_latency
+        self.dimensions = dimensions
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def embed_content(self, model: str, contents: Union[str, List[str]], config: dict = None):
+        texts = [contents] if isinstance(contents, str) else list(contents)
+        with self._lock:
+            self.requests += 1
+        time.sleep(self.latency + self.per_item_latency * len(texts))
+        dimensions = (config or {}).get("output_dimensionality", self.dimensions)
+        return SimpleNamespace(embeddings=[
+            SimpleNamespace(values=hash_embedding(text, dimensions)) for text in texts
+        ])
+
+
+class FakeEmbeddingClient:
+    """Mimics `genai.Client` closely enough for `client.models.embed_content`."""
+
+    def __init__(self, latency: float = 0.08, per_item_latency: float = 0.001, dimensions: int = 64):
+        self.models = FakeEmbeddingModels(latency, per_item_latency, dimensions)
+
+
+class HashEmbeddings(Embeddings):
+    """LangChain Embeddings backed by hash_embedding, for document RAG benchmarks."""
+
+    def __init__(self, dimensions: int = 256, latency: float = 0.0):
+        self.model = f"hash-embedding-{dimensions}"
+        self.dimensions = dimensions
+        self.latency = latency
+        self.embedded = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.latency)
+        self.embedded += len(texts)
+        return [hash_embedding(text, self.dimensions) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(self.latency)
+        return hash_embedding(text, self.dimensions)
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model that answers from a script of `responses` (tool calls included), after `latency` seconds.
+
+    The sync path sleeps and the async path awaits, like a real client would block or
+    yield while waiting on the API. Streaming emits the text word by word.
+    """
+
+    responses: List[AIMessage]
+    latency: float = 0.0
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _reply(self, messages) -> AIMessage:
+        # Pick the reply by how many AI messages follow the last user message, so every
+        # turn of every (concurrent) conversation walks through the script from the start
+        self.calls += 1
+        turn = 0
+        for message in reversed(messages):
+            if message.type == "human":
+                break
+            turn += message.type == "ai"
+        return self.responses[turn % len(self.responses)]
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        result = self._generate(messages, stop, **kwargs)
+        response = result.generations[0].message
+        words = response.content.split(" ") if response.content else []
+        for i, word in enumerate(words):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else " " + word))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+        if response.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": i}
+                for i, call in enumerate(response.tool_calls)
+            ]))
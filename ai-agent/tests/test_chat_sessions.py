@@ -0,0 +1,106 @@
+import os
+import sys
+import tempfile
+import types
+import unittest
+
+os.environ.setdefault("VECTOR_DB_PATH", tempfile.mkdtemp(prefix="test_chat_sessions_"))
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+os.environ["DOCUMENT_WATCH"] = "false"
+
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+
+# Stand in for the Gemini agents so importing the server loads no real tools or clients
+sys.modules.setdefault("core.agents.langchain_agent", types.SimpleNamespace(
+    langgraph_agent=None, langgraph_web_agent=None))
+import web.server as server
+from web.session_store import SessionStore
+
+class FakeAgent:
+    """Records the prompt of every turn and answers with a numbered reply."""
+
+    def __init__(self):
+        self.prompts = []
+
+    async def ainvoke(self, input, config=None):
+        self.prompts.append([(role, content) for role, content in input["messages"] if role != "system"])
+        return {"messages": [AIMessage(f"answer {len(self.prompts)}")]}
+
+class FakeFrontend:
+    """What the chat UI and app/api/chat/route.ts do: save the user message, then send
+    history_length (and on a 409, context) for the history before it."""
+
+    def __init__(self, client, session_id):
+        self.client = client
+        self.session_id = session_id
+        self.saved = []
+        self.conflicts = 0
+
+    def send(self, message):
+        self.saved.append({"role": "user", "content": message})
+        history = self.saved[:-1]
+        body = {"message": message, "session_id": self.session_id, "history_length": len(history)}
+        response = self.client.post("/api/chat", json=body)
+        if response.status_code == 409:
+            self.conflicts += 1
+            response = self.client.post("/api/chat", json={**body, "context": history})
+        response.raise_for_status()
+        answer = response.json()["response"]
+        self.saved.append({"role": "assistant", "content": answer})
+        return answer
+
+class ChatSessionTest(unittest.TestCase):
+    def setUp(self):
+        self.agent = FakeAgent()
+        self.sessions = SessionStore(spill_directory=None)
+        self.patch(server, "langgraph_web_agent", self.agent)
+        self.patch(server, "sessions", self.sessions)
+        # No `with`: startup hooks (memory, documents) are not needed here
+        self.frontend = FakeFrontend(TestClient(server.app), "session-1")
+
+    def patch(self, module, name, value):
+        original = getattr(module, name)
+        setattr(module, name, value)
+        self.addCleanup(setattr, module, name, original)
+
+    def expected_prompt(self):
+        # Saved history with the last user message as the new one, each message once
+        return [(message["role"], message["content"]) for message in self.frontend.saved]
+
+    def test_turns_without_context_use_server_history(self):
+        self.frontend.send("hi")
+        self.frontend.send("how are you")
+
+        self.assertEqual(self.frontend.conflicts, 0)
+        self.assertEqual(self.agent.prompts[-1], [("user", "hi"), ("assistant", "answer 1"), ("user", "how are you")])
+        self.assertEqual(self.sessions.get("session-1")["total"], len(self.frontend.saved))
+
+    def test_resend_then_next_turn_has_no_duplicates_or_conflicts(self):
+        self.frontend.send("hi")
+        self.frontend.send("hi again")
+        # Server restart (or another worker): it no longer holds the session
+        self.patch(server, "sessions", SessionStore(spill_directory=None))
+
+        self.frontend.send("still there?")
+        self.assertEqual(self.frontend.conflicts, 1)
+        self.assertEqual(self.agent.prompts[-1], self.expected_prompt()[:-1])
+
+        self.frontend.send("good")
+        self.assertEqual(self.frontend.conflicts, 1)
+        self.assertEqual(self.agent.prompts[-1], self.expected_prompt()[:-1])
+        stored = server.sessions.get("session-1")
+        self.assertEqual(stored["messages"], self.frontend.saved)
+        self.assertEqual(stored["total"], len(self.frontend.saved))
+
+    def test_stale_server_copy_is_replaced(self):
+        self.frontend.send("hi")
+        # A turn this server never saw, e.g. answered by another worker
+        self.frontend.saved += [{"role": "user", "content": "elsewhere"}, {"role": "assistant", "content": "there"}]
+
+        self.frontend.send("back here")
+        self.assertEqual(self.frontend.conflicts, 1)
+        self.assertEqual(self.agent.prompts[-1], self.expected_prompt()[:-1])
+
+if __name__ == "__main__":
+    unittest.main()
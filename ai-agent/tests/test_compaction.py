@@ -0,0 +1,134 @@
+import unittest
+from core.memory.chat_history import ChatHistory
+from core.memory.compaction import ConversationCompactor
+from core.utils.tokens import estimate_tokens
+
+class FakeSummarizer:
+    """Deterministic summarizer: appends the user messages of the folded turns, so the
+    summary is the same however the background worker batches them."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, summary, turns):
+        self.calls.append((summary, [turn["user"] for turn in turns]))
+        return ", ".join([summary] * bool(summary) + [turn["user"] for turn in turns])
+
+class FailingSummarizer(FakeSummarizer):
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    def __call__(self, summary, turns):
+        if self.failures:
+            self.failures -= 1
+            self.calls.append((summary, [turn["user"] for turn in turns]))
+            raise RuntimeError("model unavailable")
+        return super().__call__(summary, turns)
+
+class FakeVectorMemory:
+    def __init__(self):
+        self.turns = []
+
+    def add_conversation(self, user_message, ai_message):
+        self.turns.append((user_message, ai_message))
+
+    def close(self):
+        pass
+
+def turn_tokens(index):
+    return estimate_tokens(f"User: question {index}\nAI: answer {index}\n")
+
+class ConversationCompactionTest(unittest.TestCase):
+    def make_history(self, summarizer, max_turns=3):
+        history = ChatHistory(write_behind=False, vector_memory=FakeVectorMemory(),
+                              max_tokens=10_000, max_turns=max_turns, summarizer=summarizer)
+        self.addCleanup(history.close)
+        return history
+
+    def add_turns(self, history, start, end):
+        for i in range(start, end):
+            history.add_message(f"question {i}", f"answer {i}")
+
+    def test_no_summary_below_threshold(self):
+        summarizer = FakeSummarizer()
+        history = self.make_history(summarizer)
+        self.add_turns(history, 0, 3)
+        self.assertTrue(history.compactor.flush(timeout=5))
+
+        self.assertEqual(summarizer.calls, [])
+        self.assertEqual(history.get_history(),
+                         "".join(f"User: question {i}\nAI: answer {i}\n" for i in range(3)))
+
+    def test_evicted_turns_fold_into_rolling_summary(self):
+        summarizer = FakeSummarizer()
+        history = self.make_history(summarizer)
+        self.add_turns(history, 0, 4)
+        self.assertTrue(history.compactor.flush(timeout=5))
+        self.assertEqual(history.compactor.summary, "question 0")
+
+        self.add_turns(history, 4, 6)
+        self.assertTrue(history.compactor.flush(timeout=5))
+        # Earlier summary is carried into the next fold, oldest turns first
+        self.assertEqual(history.compactor.summary, "question 0, question 1, question 2")
+        self.assertEqual(summarizer.calls[0], ("", ["question 0"]))
+        self.assertTrue(summarizer.calls[-1][0].startswith("question 0"))
+
+    def test_recent_turns_are_kept_verbatim(self):
+        history = self.make_history(FakeSummarizer())
+        self.add_turns(history, 0, 6)
+        self.assertTrue(history.compactor.flush(timeout=5))
+
+        self.assertEqual([turn["user"] for turn in history.session_history.turns],
+                         ["question 3", "question 4", "question 5"])
+        # Every turn still reaches long-term memory, compacted or not
+        self.assertEqual(len(history.vector_memory.turns), 6)
+
+    def test_prompt_is_summary_then_recent_turns(self):
+        history = self.make_history(FakeSummarizer())
+        self.add_turns(history, 0, 5)
+        self.assertTrue(history.compactor.flush(timeout=5))
+
+        recent = "".join(f"User: question {i}\nAI: answer {i}\n" for i in range(2, 5))
+        self.assertEqual(history.get_history(),
+                         f"Summary of the earlier conversation:\nquestion 0, question 1\n\n"
+                         f"Recent conversation:\n{recent}")
+
+    def test_token_budget_triggers_compaction(self):
+        summarizer = FakeSummarizer()
+        history = ChatHistory(write_behind=False, vector_memory=FakeVectorMemory(),
+                              max_tokens=turn_tokens(0) * 2, max_turns=100, summarizer=summarizer)
+        self.addCleanup(history.close)
+        self.add_turns(history, 0, 3)
+        self.assertTrue(history.compactor.flush(timeout=5))
+
+        self.assertEqual(len(history.session_history), 2)
+        self.assertEqual(history.compactor.summary, "question 0")
+
+    def test_reset_clears_summary(self):
+        history = self.make_history(FakeSummarizer())
+        self.add_turns(history, 0, 5)
+        self.assertTrue(history.compactor.flush(timeout=5))
+        history.reset_history()
+
+        self.assertEqual(history.compactor.summary, "")
+        self.assertEqual(history.get_history(), "")
+
+    def test_failed_turns_are_retried_with_the_next_batch(self):
+        summarizer = FailingSummarizer(failures=1)
+        compactor = ConversationCompactor(summarizer)
+        compactor.submit([{"user": "a", "ai": "1"}])
+        self.assertTrue(compactor.flush(timeout=5))
+        self.assertEqual(compactor.summary, "")
+
+        compactor.submit([{"user": "b", "ai": "2"}])
+        self.assertTrue(compactor.flush(timeout=5))
+        self.assertEqual(compactor.summary, "a, b")
+
+    def test_no_compactor_when_summarization_is_off(self):
+        history = ChatHistory(write_behind=False, vector_memory=FakeVectorMemory(), summarize=False)
+        self.addCleanup(history.close)
+        self.assertIsNone(history.compactor)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,18 +1,39 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Any, AsyncIterator, Optional, List
 import sys
 import os
+import json
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
 
 # Add the parent directory to Python path to import from ai-agent
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from core.agents.langchain_agent import langgraph_web_agent
+from core.memory import service as memory_service
+from core.tools import document_reader
+from core.tools.tool_cache import get_tool_cache
+from web.session_store import SessionStore
 
 
+load_dotenv()
+
 app = FastAPI()
 
+# Agent turns running at once; further chat requests wait for a free slot
+CHAT_MAX_CONCURRENCY = int(os.getenv("CHAT_MAX_CONCURRENCY", 8))
+# Threads for blocking calls of concurrent agent turns (tool calls have their own pool, see TimeoutToolNode)
+CHAT_TOOL_THREADS = int(os.getenv("CHAT_TOOL_THREADS", 16))
+chat_slots = asyncio.Semaphore(CHAT_MAX_CONCURRENCY)
+
+DOCUMENTS_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "public", "documents")
+document_watcher = None
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -22,44 +43,193 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def bound_tool_threads():
+    # Blocking work the async agent hands to run_in_executor (e.g. sync model calls) uses the default executor
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=CHAT_TOOL_THREADS, thread_name_prefix="chat-tool"))
+
+@app.on_event("startup")
+def warm_memory():
+    # Open the shared memory store once so the first recall does not pay client start-up cost
+    memory_service.get_chat_history()
+    # Same for the document store and RAG chain behind ask_document_question
+    document_reader.get_rag_engine().warm_up()
+
+@app.on_event("startup")
+def watch_documents():
+    # Catch up with the documents folder, then re-ingest files as they are added or changed
+    if os.getenv("DOCUMENT_WATCH", "true").lower() != "true":
+        return
+
+    def run():
+        global document_watcher
+        document_reader.ingest_documents(DOCUMENTS_FOLDER)
+        document_watcher = document_reader.watch_documents(DOCUMENTS_FOLDER)
+
+    threading.Thread(target=run, name="document-ingest", daemon=True).start()
+
+@app.on_event("shutdown")
+def shutdown_memory():
+    if document_watcher is not None:
+        document_watcher.stop()
+    memory_service.shutdown()
+
+# Server-side history per session_id, so clients only need to send the new message
+sessions = SessionStore()
+
 class ChatRequest(BaseModel):
     message: str
     session_id: Optional[str] = None
     user_id: Optional[str] = None
+    # Full history before `message` (without it); only needed when the server does not hold the
+    # session or its copy is out of date (first request, eviction, restart, another worker)
     context: Optional[List[dict]] = None
+    # Number of messages the client has for this session before `message`; lets the server ask
+    # for context when its copy is missing or out of date
+    history_length: Optional[int] = None
 
 class ChatResponse(BaseModel):
     response: str
 
+def build_messages(request: ChatRequest) -> list:
+    """System prompt, session history and the new message, as agent input."""
+    # Start with system message
+    messages = [
+        ("system", "You are an advanced AI assistant designed to help users with a wide range of tasks and tools. You can execute various tools in parallel or in order to give the most precise output the user would need."
+        "I want you to not use asterisks signs in your answers strictly"
+        "Your goal is to assist users efficiently, provide accurate information, and execute tasks seamlessly. Always prioritize user safety and confirm before performing critical actions like shutting down or restarting the system.")
+    ]
+    history = []
+    if request.context is not None:
+        history = [{"role": msg["role"], "content": msg["content"]} for msg in request.context]
+        if request.session_id:
+            sessions.set(request.session_id, history)
+    elif request.session_id:
+        session = sessions.get(request.session_id)
+        if session is None:
+            if request.history_length:
+                # Tell the client to resend this request with its full context
+                raise HTTPException(status_code=409, detail="Session history not found on server, resend with context")
+        elif request.history_length is not None and session["total"] != request.history_length:
+            # Stale copy (another worker, a recreated session, a failed append): ask for the full context too
+            raise HTTPException(status_code=409, detail="Session history out of date on server, resend with context")
+        else:
+            history = session["messages"]
+
+    # Add context messages if available
+    if history:
+        for msg in history:
+            if msg["role"] == "user":
+                messages.append(("user", msg["content"]))
+            elif msg["role"] == "assistant":
+                messages.append(("assistant", msg["content"]))
+    # Add current message
+    messages.append(("user", request.message))
+    return messages
+
+def remember_turn(request: ChatRequest, ai_message: str) -> None:
+    if request.session_id:
+        sessions.append(request.session_id, [
+            {"role": "user", "content": request.message},
+            {"role": "assistant", "content": ai_message}
+        ])
+
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     try:
-        # Start with system message
-        messages = [
-            ("system", "You are an advanced AI assistant designed to help users with a wide range of tasks and tools. You can execute various tools in parallel or in order to give the most precise output the user would need."
-            "I want you to not use asterisks signs in your answers strictly"
-            "Your goal is to assist users efficiently, provide accurate information, and execute tasks seamlessly. Always prioritize user safety and confirm before performing critical actions like shutting down or restarting the system.")
-        ]
-        # Add context messages if available
-        if request.context:
-            for msg in request.context:
-                if msg["role"] == "user":
-                    messages.append(("user", msg["content"]))
-                elif msg["role"] == "assistant":
-                    messages.append(("tool", msg["content"]))
-        # Add current message
-        messages.append(("user", request.message))
-        
-        result = langgraph_web_agent.invoke({"messages": messages})
+        messages = build_messages(request)
+
+        async with chat_slots:
+            result = await langgraph_web_agent.ainvoke({"messages": messages})
 
         ai_message = result["messages"][-1].content
+        remember_turn(request, ai_message)
 
         return ChatResponse(response=ai_message)
     
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error processing request: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def message_text(content: Any) -> str:
+    """Text of a message or chunk; Gemini may return a list of content parts."""
+    if isinstance(content, str):
+        return content
+    return "".join(part if isinstance(part, str) else part.get("text", "")
+                   for part in content if isinstance(part, (str, dict)))
+
+def is_top_level(event: dict) -> bool:
+    # Agents that tools run internally (file, process, WhatsApp) stream through the same
+    # callbacks; their events carry a nested checkpoint namespace ("tools:...|agent:...")
+    return "|" not in event.get("metadata", {}).get("langgraph_checkpoint_ns", "")
+
+async def agent_events(messages: list, request: ChatRequest, http_request: Request) -> AsyncIterator[str]:
+    """Translate the agent's astream_events into SSE events:
+    token (answer deltas), tool_start, tool_end, then done (full answer) or error."""
+    final = None
+    tokens = []
+    try:
+        async with chat_slots:
+            async for event in langgraph_web_agent.astream_events({"messages": messages}, version="v2"):
+                if await http_request.is_disconnected():
+                    # Closing the stream cancels the agent run, including pending model calls
+                    print("Chat stream client disconnected, cancelling the agent run")
+                    return
+
+                kind = event["event"]
+                if kind == "on_chat_model_start" and is_top_level(event):
+                    # Only the last model call's text is the answer; earlier ones preceded tool calls
+                    tokens = []
+                elif kind == "on_chat_model_stream" and is_top_level(event):
+                    text = message_text(event["data"]["chunk"].content)
+                    if text:
+                        tokens.append(text)
+                        yield sse_event("token", {"content": text})
+                elif kind == "on_tool_start" and is_top_level(event):
+                    yield sse_event("tool_start", {"name": event["name"], "run_id": event["run_id"],
+                                                   "input": event["data"].get("input")})
+                elif kind == "on_tool_end" and is_top_level(event):
+                    output = event["data"].get("output")
+                    yield sse_event("tool_end", {"name": event["name"], "run_id": event["run_id"],
+                                                 "output": str(getattr(output, "content", output))})
+                elif kind == "on_chain_end" and not event["parent_ids"]:
+                    final = event["data"]["output"]["messages"][-1].content
+
+        ai_message = message_text(final) if final is not None else "".join(tokens)
+        remember_turn(request, ai_message)
+        yield sse_event("done", {"response": ai_message})
+    except Exception as e:
+        print(f"Error streaming chat response: {str(e)}")
+        yield sse_event("error", {"detail": str(e)})
+
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest, http_request: Request):
+    """Server-sent events version of /api/chat: answer tokens and tool calls arrive as
+    the agent produces them instead of one response at the end of the turn."""
+    messages = build_messages(request)
+    return StreamingResponse(
+        agent_events(messages, request, http_request),
+        media_type="text/event-stream",
+        # Stop proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/api/documents/cache-stats")
+def document_cache_stats():
+    """Hit rate and size of the semantic answer cache behind document questions."""
+    return document_reader.get_rag_engine().cache_stats()
+
+@app.get("/api/tools/cache-stats")
+def tool_cache_stats():
+    """Hits and misses of the tool result cache, overall and per tool."""
+    return get_tool_cache().stats()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
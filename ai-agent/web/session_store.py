@@ -0,0 +1,148 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from core.utils.tokens import estimate_tokens
+
+load_dotenv()
+
+class SessionStore:
+    """Server-side chat history for the web API, keyed by session id.
+
+    - At most `max_sessions` sessions are kept in memory; the least recently used one
+      is evicted first (and written to `spill_directory` if one is configured).
+    - Sessions idle for longer than `ttl_seconds` expire, in memory and on disk.
+    - Each session keeps only its newest messages, within `max_tokens` estimated
+      tokens and `max_messages` messages.
+
+    `total` counts every message ever appended to a session, including trimmed ones,
+    so callers can tell whether the server's copy is in step with the client.
+    """
+
+    def __init__(self,
+                 max_sessions: int = int(os.getenv("WEB_SESSION_MAX", 1000)),
+                 ttl_seconds: float = float(os.getenv("WEB_SESSION_TTL", 3600)),
+                 max_tokens: int = int(os.getenv("WEB_SESSION_MAX_TOKENS", 4000)),
+                 max_messages: int = int(os.getenv("WEB_SESSION_MAX_MESSAGES", 100)),
+                 spill_directory: Optional[str] = os.getenv("WEB_SESSION_SPILL_DIR") or None):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_tokens = max_tokens
+        self.max_messages = max_messages
+        self.spill_directory = spill_directory
+        self._sessions: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        if spill_directory:
+            os.makedirs(spill_directory, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        """Return {"messages": [...], "total": n} or None if the session is unknown or expired."""
+        with self._lock:
+            session = self._touch(session_id)
+            if session is None:
+                return None
+            return {"messages": list(session["messages"]), "total": session["total"]}
+
+    def set(self, session_id: str, messages: List[Dict[str, str]]) -> None:
+        """Replace a session's history, e.g. when the client resends its full context."""
+        with self._lock:
+            session = {"messages": [], "tokens": [], "total": 0, "last_access": time.time()}
+            self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+            self._append(session, messages)
+            self._evict()
+
+    def append(self, session_id: str, messages: List[Dict[str, str]]) -> None:
+        with self._lock:
+            session = self._touch(session_id)
+            if session is None:
+                session = {"messages": [], "tokens": [], "total": 0, "last_access": time.time()}
+                self._sessions[session_id] = session
+                self._evict()
+            self._append(session, messages)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._remove_spilled(session_id)
+
+    def _touch(self, session_id: str) -> Optional[Dict]:
+        """Look up a live session (restoring it from disk if spilled) and mark it most recently used."""
+        session = self._sessions.pop(session_id, None) or self._load_spilled(session_id)
+        if session is None:
+            return None
+
+        if time.time() - session["last_access"] > self.ttl_seconds:
+            self._remove_spilled(session_id)
+            return None
+
+        session["last_access"] = time.time()
+        self._sessions[session_id] = session
+        self._evict()
+        return session
+
+    def _append(self, session: Dict, messages: List[Dict[str, str]]) -> None:
+        for message in messages:
+            entry = {"role": message["role"], "content": message["content"]}
+            session["messages"].append(entry)
+            session["tokens"].append(estimate_tokens(entry["content"]))
+            session["total"] += 1
+
+        tokens = sum(session["tokens"])
+        while len(session["messages"]) > 1 and (tokens > self.max_tokens or len(session["messages"]) > self.max_messages):
+            session["messages"].pop(0)
+            tokens -= session["tokens"].pop(0)
+
+    def _evict(self) -> None:
+        # The dict is in least-recently-used order, so expired sessions sit at the front
+        now = time.time()
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session["last_access"] <= self.ttl_seconds:
+                break
+            del self._sessions[session_id]
+            self._remove_spilled(session_id)
+
+        while len(self._sessions) > self.max_sessions:
+            session_id, session = self._sessions.popitem(last=False)
+            self._spill(session_id, session)
+
+    def _spill_path(self, session_id: str) -> str:
+        name = hashlib.sha256(session_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.spill_directory, f"{name}.json")
+
+    def _spill(self, session_id: str, session: Dict) -> None:
+        if not self.spill_directory:
+            return
+        try:
+            with open(self._spill_path(session_id), "w", encoding="utf-8") as f:
+                json.dump(session, f)
+        except OSError as e:
+            print(f"Error spilling session {session_id} to disk: {e}")
+
+    def _load_spilled(self, session_id: str) -> Optional[Dict]:
+        if not self.spill_directory:
+            return None
+        path = self._spill_path(session_id)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                session = json.load(f)
+            os.remove(path)
+            return session
+        except (OSError, ValueError):
+            return None
+
+    def _remove_spilled(self, session_id: str) -> None:
+        if self.spill_directory:
+            try:
+                os.remove(self._spill_path(session_id))
+            except OSError:
+                pass